@@ -139,11 +139,33 @@ LANGUAGE plpgsql SECURITY DEFINER
 SET search_path = public, extensions
 AS $$
 BEGIN
+    -- One pass over kb_chunks for all three chunk counts
     RETURN QUERY
     SELECT
         (SELECT COUNT(*) FROM kb_sources),
-        (SELECT COUNT(*) FROM kb_chunks),
-        (SELECT COUNT(*) FROM kb_chunks WHERE embedding IS NOT NULL),
-        (SELECT COUNT(*) FROM kb_chunks WHERE embedding IS NULL);
+        COUNT(*),
+        COUNT(*) FILTER (WHERE c.embedding IS NOT NULL),
+        COUNT(*) FILTER (WHERE c.embedding IS NULL)
+    FROM kb_chunks c;
+END;
+$$;
+
+-- Bulk embedding update: one round trip for many chunks
+-- updates: [{"id": 1, "embedding": [...]}, ...]
+CREATE OR REPLACE FUNCTION kb_update_embeddings(updates JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public, extensions
+AS $$
+DECLARE
+    updated INTEGER;
+BEGIN
+    UPDATE kb_chunks c
+    SET embedding = (u->>'embedding')::vector
+    FROM jsonb_array_elements(updates) AS u
+    WHERE c.id = (u->>'id')::INT;
+
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
 END;
 $$;
@@ -503,6 +503,18 @@ BEGIN
 END;
 $$;
 
+-- Batched variant: one round trip for all entries returned by a search
+CREATE OR REPLACE FUNCTION mb_log_access_batch(p_memory_ids UUID[], p_agent_id UUID)
+RETURNS VOID
+LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public, extensions
+AS $$
+BEGIN
+    INSERT INTO mb_memory_access_log (memory_id, agent_id)
+    SELECT unnest(p_memory_ids), p_agent_id;
+END;
+$$;
+
 -- ----------------------------------------------------------------------------
 -- Aggregate access counts (run via pg_cron in off-peak hours)
 -- Moves counts from access log into mb_memory.access_count in bulk.
@@ -8,13 +8,26 @@ Usage:
     python3 bootstrap.py access     # Grant RAG access
     python3 bootstrap.py test       # Run smoke test
     python3 bootstrap.py all        # Run all steps
+
+Pass --yes (or set BOOTSTRAP_NONINTERACTIVE=1) to never prompt; manual
+schema steps are then assumed done and checked by the table/RPC probes.
 """
 
 from __future__ import annotations
 
+import functools
 import os
+import platform
 import sys
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Imported lazily at runtime so step 1 can report it as missing
+    import requests
 
 # Ensure project root is in path
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
@@ -30,6 +43,8 @@ for cache_dir in SRC_ROOT.rglob("__pycache__"):
 
 from dotenv import load_dotenv, set_key
 
+from knowledgebase.fastjson import dumps, loads
+
 ENV_PATH = PROJECT_ROOT / ".env"
 WORKSPACE_ENV_PATH = PROJECT_ROOT.parent / ".env"
 SCHEMA_PATH = PROJECT_ROOT / "schema.sql"
@@ -38,30 +53,82 @@ SCHEMA_MEMORY_PATH = PROJECT_ROOT / "schema_memory.sql"
 
 # ── Utilities ────────────────────────────────────────────────────────
 
+# Plain output when piped (CI logs) or when NO_COLOR is set (no-color.org)
+_USE_COLOR = sys.stdout.isatty() and "NO_COLOR" not in os.environ
+
+
 class Colors:
-    OK = "\033[92m"
-    WARN = "\033[93m"
-    FAIL = "\033[91m"
-    BOLD = "\033[1m"
-    END = "\033[0m"
+    OK = "\033[92m" if _USE_COLOR else ""
+    WARN = "\033[93m" if _USE_COLOR else ""
+    FAIL = "\033[91m" if _USE_COLOR else ""
+    BOLD = "\033[1m" if _USE_COLOR else ""
+    END = "\033[0m" if _USE_COLOR else ""
+
+
+OK_PREFIX = f"  {Colors.OK}✓{Colors.END} "
+FAIL_PREFIX = f"  {Colors.FAIL}✗{Colors.END} "
+WARN_PREFIX = f"  {Colors.WARN}⚠{Colors.END} "
+HEADING_BAR = f"{Colors.BOLD}{'─' * 60}{Colors.END}"
 
 
 def ok(msg: str) -> None:
-    print(f"  {Colors.OK}✓{Colors.END} {msg}")
+    sys.stdout.write(f"{OK_PREFIX}{msg}\n")
 
 
 def fail(msg: str) -> None:
-    print(f"  {Colors.FAIL}✗{Colors.END} {msg}")
+    sys.stdout.write(f"{FAIL_PREFIX}{msg}\n")
 
 
 def warn(msg: str) -> None:
-    print(f"  {Colors.WARN}⚠{Colors.END} {msg}")
+    sys.stdout.write(f"{WARN_PREFIX}{msg}\n")
 
 
 def heading(msg: str) -> None:
-    print(f"\n{Colors.BOLD}{'─' * 60}{Colors.END}")
-    print(f"{Colors.BOLD}  {msg}{Colors.END}")
-    print(f"{Colors.BOLD}{'─' * 60}{Colors.END}")
+    sys.stdout.write(f"\n{HEADING_BAR}\n{Colors.BOLD}  {msg}{Colors.END}\n{HEADING_BAR}\n")
+
+
+_WARNED_NO_TTY = False
+
+
+def _non_interactive() -> bool:
+    """True when prompts must not block (--yes, env flag, or no TTY).
+
+    Falling back on a missing TTY is announced once, since it answers
+    prompts the user never saw.
+    """
+    global _WARNED_NO_TTY
+    if (
+        os.getenv("BOOTSTRAP_NONINTERACTIVE", "") not in ("", "0")
+        or "--yes" in sys.argv
+        or "-y" in sys.argv
+    ):
+        return True
+    if sys.stdin.isatty():
+        return False
+    if not _WARNED_NO_TTY:
+        _WARNED_NO_TTY = True
+        warn("stdin is not a terminal: auto-confirming prompts as if --yes was given")
+    return True
+
+
+_ENV_CACHE: dict | None = None
+_ENV_MTIME: float | None = None
+_ENV_CONFIG = None
+
+
+def _env_mtime() -> float | None:
+    try:
+        return ENV_PATH.stat().st_mtime
+    except OSError:
+        return None
+
+
+def _invalidate_env_cache() -> None:
+    """Force the next get_env() to re-read .env (call after set_key)."""
+    global _ENV_CACHE, _ENV_MTIME, _ENV_CONFIG
+    _ENV_CACHE = None
+    _ENV_MTIME = None
+    _ENV_CONFIG = None
 
 
 def get_env() -> dict:
@@ -73,7 +140,19 @@ def get_env() -> dict:
     3. Workspace .env
 
     All layers use override=False so existing env vars are never wiped.
+
+    The result is cached until .env changes on disk (or the cache is
+    invalidated explicitly), so repeated steps don't re-parse it.
     """
+    global _ENV_CACHE, _ENV_MTIME, _ENV_CONFIG
+    mtime = _env_mtime()
+    if _ENV_CACHE is not None and _ENV_MTIME == mtime:
+        # Re-inject in case a step called reload_config() in between
+        if _ENV_CONFIG is not None:
+            from knowledgebase.config import set_config
+            set_config(_ENV_CONFIG)
+        return _ENV_CACHE
+
     # Load project .env first (fills gaps), then workspace .env (fills rest)
     load_dotenv(ENV_PATH, override=False)
     workspace_dir = os.getenv("OPENCLAW_WORKSPACE")
@@ -119,9 +198,12 @@ def get_env() -> dict:
             agent_api_key=env["OPENCLAW_AGENT_KEY"],
         )
         set_config(config)
+        _ENV_CONFIG = config
     except ImportError:
         pass
 
+    _ENV_CACHE = env
+    _ENV_MTIME = mtime
     return env
 
 
@@ -133,42 +215,136 @@ def supabase_headers(env: dict) -> dict:
     }
 
 
+_SESSION: requests.Session | None = None
+_SESSION_KEY: str | None = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _get_session(env: dict | None = None) -> requests.Session:
+    """Return the shared HTTP session, creating it on first use.
+
+    One pooled session keeps the connection to Supabase alive across
+    steps instead of redoing DNS/TCP/TLS for every request. Passing
+    ``env`` installs the Supabase auth headers as session defaults.
+    """
+    global _SESSION, _SESSION_KEY
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                retry = Retry(
+                    total=3,
+                    backoff_factor=0.2,
+                    status_forcelist=(429, 502, 503, 504),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(pool_connections=10, pool_maxsize=50, max_retries=retry)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _SESSION = session
+
+    # Headers only need rebuilding when the key actually changes
+    if env is not None and env["SUPABASE_KEY"] != _SESSION_KEY:
+        _SESSION.headers.update(supabase_headers(env))
+        _SESSION_KEY = env["SUPABASE_KEY"]
+    return _SESSION
+
+
 def supabase_rpc(env: dict, fn: str, params: dict, timeout: int = 30):
     """Call a Supabase RPC function."""
-    import requests
-
-    resp = requests.post(
+    resp = _get_session(env).post(
         f"{env['SUPABASE_URL']}/rest/v1/rpc/{fn}",
-        headers=supabase_headers(env),
-        json=params,
+        data=dumps(params),
         timeout=timeout,
     )
     return resp
 
 
+def _err(resp, n: int = 300) -> str:
+    """First n bytes of a response body, for error messages.
+
+    Slicing resp.text would decode (and charset-sniff) the whole body first.
+    """
+    return resp.content[:n].decode("utf-8", errors="replace")
+
+
+class _AuthRequestError(Exception):
+    """The auth RPC could not be answered (HTTP or network error).
+
+    Raised inside the auth cache so transient failures are not memoized.
+    """
+
+
+@functools.lru_cache(maxsize=4)
+def _authenticate_cached(url: str, key: str) -> dict | None:
+    """Authenticate an agent key, returning its agent info row or None.
+
+    Cached so register, access and summary share one round trip per run.
+    Only real answers are cached (None = key rejected); a non-200 response
+    or network error raises _AuthRequestError so the next step tries again.
+    Call _authenticate_cached.cache_clear() after the key changes.
+    """
+    import requests
+
+    try:
+        resp = _get_session().post(
+            f"{url}/rest/v1/rpc/mb_authenticate_agent",
+            data=dumps({"p_api_key": key}),
+            timeout=30,
+        )
+    except requests.RequestException as e:
+        raise _AuthRequestError(str(e)) from e
+    if resp.status_code != 200:
+        raise _AuthRequestError(f"HTTP {resp.status_code}: {_err(resp)}")
+    rows = loads(resp.content)
+    return rows[0] if rows else None
+
+
+def _authenticate(env: dict) -> dict | None:
+    """Return the agent info for OPENCLAW_AGENT_KEY (cached), None if rejected.
+
+    Raises _AuthRequestError when Supabase could not be asked at all.
+    """
+    _get_session(env)  # make sure the Supabase headers are set
+    return _authenticate_cached(env["SUPABASE_URL"], env["OPENCLAW_AGENT_KEY"])
+
+
+# SQL endpoints that 404'd or refused connections earlier in this run
+_SQL_URL_BLACKLIST: set[str] = set()
+
+
 def supabase_sql(env: dict, sql: str, timeout: int = 60):
     """Execute raw SQL via Supabase's /rest/v1/rpc or pg_net.
 
     Uses the Supabase SQL endpoint (requires service_role key).
     Falls back to executing via the query endpoint if available.
+    Endpoints known to be missing are skipped for later schema files.
     """
     import requests
 
+    session = _get_session(env)
     urls_to_try = [
         f"{env['SUPABASE_URL']}/rest/v1/rpc/exec_sql",
         f"{env['SUPABASE_URL']}/pg/query",
     ]
 
     for url in urls_to_try:
+        if url in _SQL_URL_BLACKLIST:
+            continue
         try:
-            resp = requests.post(
-                url,
-                headers=supabase_headers(env),
-                json={"query": sql} if "/pg/" in url else {"sql_text": sql},
-                timeout=timeout,
-            )
+            # Encode once to bytes; Content-Type is already a session header
+            payload = {"query": sql} if "/pg/" in url else {"sql_text": sql}
+            resp = session.post(url, data=dumps(payload), timeout=timeout)
             if resp.status_code in (200, 201):
                 return resp
+            if resp.status_code == 404:
+                _SQL_URL_BLACKLIST.add(url)
+        except requests.exceptions.ConnectionError:
+            _SQL_URL_BLACKLIST.add(url)
         except Exception:
             continue
 
@@ -177,12 +353,28 @@ def supabase_sql(env: dict, sql: str, timeout: int = 60):
 
 # ── Step 1: Validate ─────────────────────────────────────────────────
 
+def _probe_supabase(env: dict) -> tuple[bool, str]:
+    """Check that the Supabase REST endpoint answers."""
+    import requests
+
+    try:
+        resp = _get_session(env).get(
+            f"{env['SUPABASE_URL']}/rest/v1/",
+            timeout=10,
+        )
+        if resp.status_code == 200:
+            return True, f"Supabase connection OK ({env['SUPABASE_URL']})"
+        return False, f"Supabase returned HTTP {resp.status_code}: {_err(resp, 200)}"
+    except requests.exceptions.ConnectionError:
+        return False, f"Cannot connect to Supabase at {env['SUPABASE_URL']}"
+    except Exception as e:
+        return False, f"Supabase error: {e}"
+
+
 def step_validate() -> bool:
     """Validate environment and connections."""
     heading("Step 1: Validate Environment")
 
-    import requests
-
     env = get_env()
     all_ok = True
 
@@ -208,46 +400,44 @@ def step_validate() -> bool:
         fail("Missing required environment variables. Update .env and retry.")
         return False
 
-    # Test Supabase connection
-    try:
-        resp = requests.get(
-            f"{env['SUPABASE_URL']}/rest/v1/",
-            headers=supabase_headers(env),
-            timeout=10,
-        )
-        if resp.status_code == 200:
-            ok(f"Supabase connection OK ({env['SUPABASE_URL']})")
-        else:
-            fail(f"Supabase returned HTTP {resp.status_code}: {resp.text[:200]}")
-            all_ok = False
-    except requests.exceptions.ConnectionError:
-        fail(f"Cannot connect to Supabase at {env['SUPABASE_URL']}")
-        all_ok = False
-    except Exception as e:
-        fail(f"Supabase error: {e}")
-        all_ok = False
-
     # Test embedding provider (config injected by get_env() above)
-    from knowledgebase.embeddings import test_connection, get_provider
+    from knowledgebase.embeddings import test_connection
     from knowledgebase.config import get_config
 
     # Verify the config singleton has the right provider
     active_config = get_config()
     provider_name = env["EMBEDDING_PROVIDER"]
     model = env["EMBEDDING_MODEL"]
-    ok(f"Provider configured: {provider_name} (config sees: {active_config.embedding_provider})")
     ok_msg = f"Provider: {provider_name} / Model: {model}"
 
     # Validate provider-specific keys before testing connection
+    key_error = None
     if provider_name == "google" and not env.get("GOOGLE_API_KEY"):
-        fail(f"EMBEDDING_PROVIDER=google but GOOGLE_API_KEY is empty")
-        all_ok = False
+        key_error = "EMBEDDING_PROVIDER=google but GOOGLE_API_KEY is empty"
     elif provider_name in ("openai", "custom") and not env.get("OPENAI_API_KEY"):
-        fail(f"EMBEDDING_PROVIDER={provider_name} but OPENAI_API_KEY is empty")
+        key_error = f"EMBEDDING_PROVIDER={provider_name} but OPENAI_API_KEY is empty"
+
+    # Supabase and the embedding provider are independent round trips:
+    # probe both at once, then report in a fixed order.
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        sb_fut = ex.submit(_probe_supabase, env)
+        emb_fut = ex.submit(test_connection) if key_error is None else None
+        supabase_ok, supabase_msg = sb_fut.result()
+        provider_ok, provider_msg = emb_fut.result() if emb_fut else (False, "")
+
+    if supabase_ok:
+        ok(supabase_msg)
+    else:
+        fail(supabase_msg)
+        all_ok = False
+
+    ok(f"Provider configured: {provider_name} (config sees: {active_config.embedding_provider})")
+
+    if key_error:
+        fail(key_error)
         all_ok = False
 
     if all_ok:
-        provider_ok, provider_msg = test_connection()
         if provider_ok:
             ok(f"Embeddings OK — {ok_msg}")
             ok(f"  {provider_msg}")
@@ -266,22 +456,49 @@ def step_validate() -> bool:
 
 # ── Step 2: Apply Schema ─────────────────────────────────────────────
 
+def _probe_table(env: dict, table: str) -> tuple[bool, str]:
+    """Check that a table is reachable via PostgREST."""
+    try:
+        resp = _get_session(env).get(
+            f"{env['SUPABASE_URL']}/rest/v1/{table}",
+            params={"limit": "0"},
+            timeout=10,
+        )
+        if resp.status_code == 200:
+            return True, f"Table '{table}' exists"
+        return False, f"Table '{table}' not found (HTTP {resp.status_code})"
+    except Exception as e:
+        return False, f"Error checking table '{table}': {e}"
+
+
+def _probe_rpc(env: dict, rpc: str) -> tuple[bool, str]:
+    """Check that an RPC function exists (empty args may still 400/422)."""
+    try:
+        resp = supabase_rpc(env, rpc, {}, timeout=5)
+        if resp.status_code in (200, 400, 422):
+            return True, f"RPC function '{rpc}' exists"
+        if resp.status_code == 404:
+            return False, f"RPC function '{rpc}' not found"
+        return True, f"RPC function '{rpc}' exists (returned {resp.status_code})"
+    except Exception as e:
+        return False, f"Error checking RPC '{rpc}': {e}"
+
+
 def step_schema() -> bool:
     """Apply SQL schemas to Supabase."""
     heading("Step 2: Apply Schema")
-    import requests
 
     env = get_env()
-    headers = supabase_headers(env)
 
     schemas = []
     for path, label in [(SCHEMA_PATH, "schema.sql"), (SCHEMA_MEMORY_PATH, "schema_memory.sql")]:
         if not path.exists():
             fail(f"{label} not found at {path}")
             return False
-        sql = path.read_text()
+        size = path.stat().st_size  # on-disk bytes, not decoded characters
+        sql = path.read_text(encoding="utf-8")
         schemas.append((sql, label))
-        ok(f"Loaded {label} ({len(sql)} bytes)")
+        ok(f"Loaded {label} ({size} bytes)")
 
     for sql, label in schemas:
         result = supabase_sql(env, sql)
@@ -297,45 +514,30 @@ def step_schema() -> bool:
         print(f"    3. Click 'Run'")
         print()
 
+        if _non_interactive():
+            warn(f"Non-interactive run: assuming {label} was applied, verifying below")
+            continue
+
         response = input(f"    Have you applied {label}? [y/N]: ").strip().lower()
         if response != "y":
             fail(f"Schema {label} not applied. Cannot continue.")
             return False
 
-    # Verify critical tables exist
+    # Verify critical tables and RPC functions. The probes are independent
+    # round trips, so run them concurrently and report in a fixed order.
     tables_to_check = ["kb_sources", "kb_chunks", "mb_agents", "mb_memory", "mb_teams"]
-    all_ok = True
-    for table in tables_to_check:
-        try:
-            resp = requests.get(
-                f"{env['SUPABASE_URL']}/rest/v1/{table}",
-                headers=headers,
-                params={"limit": "0"},
-                timeout=10,
-            )
-            if resp.status_code == 200:
-                ok(f"Table '{table}' exists")
-            else:
-                fail(f"Table '{table}' not found (HTTP {resp.status_code})")
-                all_ok = False
-        except Exception as e:
-            fail(f"Error checking table '{table}': {e}")
-            all_ok = False
-
-    # Verify critical RPC functions
     rpcs = ["mb_register_agent", "mb_authenticate_agent", "mb_search_memory", "mb_search_all"]
-    for rpc in rpcs:
-        try:
-            resp = supabase_rpc(env, rpc, {}, timeout=5)
-            if resp.status_code in (200, 400, 422):
-                ok(f"RPC function '{rpc}' exists")
-            elif resp.status_code == 404:
-                fail(f"RPC function '{rpc}' not found")
-                all_ok = False
-            else:
-                ok(f"RPC function '{rpc}' exists (returned {resp.status_code})")
-        except Exception as e:
-            fail(f"Error checking RPC '{rpc}': {e}")
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        futures = [ex.submit(_probe_table, env, t) for t in tables_to_check]
+        futures += [ex.submit(_probe_rpc, env, r) for r in rpcs]
+        results = [f.result() for f in futures]
+
+    all_ok = True
+    for passed, msg in results:
+        if passed:
+            ok(msg)
+        else:
+            fail(msg)
             all_ok = False
 
     if all_ok:
@@ -345,6 +547,17 @@ def step_schema() -> bool:
 
 # ── Step 3: Register Agent ───────────────────────────────────────────
 
+_HOSTNAME: str | None = None
+
+
+def _short_hostname() -> str:
+    """Lower-cased hostname without the domain part (computed once)."""
+    global _HOSTNAME
+    if _HOSTNAME is None:
+        _HOSTNAME = platform.node().lower().partition(".")[0]
+    return _HOSTNAME
+
+
 def step_register() -> bool:
     """Register this agent in mb_agents."""
     heading("Step 3: Register Agent")
@@ -355,10 +568,10 @@ def step_register() -> bool:
 
     # Generate name if not set
     if not agent_name:
-        import socket
-        agent_name = f"openclaw-{socket.gethostname().lower().split('.')[0]}"
+        agent_name = f"openclaw-{_short_hostname()}"
         warn(f"OPENCLAW_AGENT_NAME not set, using: {agent_name}")
         set_key(str(ENV_PATH), "OPENCLAW_AGENT_NAME", agent_name)
+        _invalidate_env_cache()
         ok(f"Saved OPENCLAW_AGENT_NAME={agent_name} to .env")
 
     # Generate API key if not set
@@ -379,21 +592,23 @@ def step_register() -> bool:
         "p_metadata": {"bootstrap": True, "version": "0.2.0"},
     })
 
-    if resp.status_code == 200 and resp.json():
-        agent_id = resp.json()
+    agent_id = loads(resp.content) if resp.status_code == 200 else None
+    if agent_id:
         if isinstance(agent_id, str):
             agent_id = agent_id.strip('"')
         ok(f"Agent registered: {agent_name} ({agent_id})")
 
         # Save key to .env
         set_key(str(ENV_PATH), "OPENCLAW_AGENT_KEY", agent_key)
+        _invalidate_env_cache()
+        _authenticate_cached.cache_clear()
         ok(f"Saved OPENCLAW_AGENT_KEY to .env")
 
         if new_key_generated:
             print(f"\n  {Colors.WARN}SAVE THIS KEY — it cannot be recovered:{Colors.END}")
             print(f"  {Colors.BOLD}{agent_key}{Colors.END}\n")
 
-    elif "duplicate key" in resp.text.lower() or "unique" in resp.text.lower():
+    elif "duplicate key" in (body := _err(resp, 2000).lower()) or "unique" in body:
         warn(f"Agent '{agent_name}' already registered")
 
         # If we generated a new key but agent exists, we can't use it
@@ -405,18 +620,21 @@ def step_register() -> bool:
             return False
         ok("Using existing API key from .env")
     else:
-        fail(f"Registration failed: HTTP {resp.status_code} — {resp.text[:300]}")
+        fail(f"Registration failed: HTTP {resp.status_code} — {_err(resp, 300)}")
         return False
 
     # Verify authentication
     env = get_env()  # reload to pick up saved values
-    resp = supabase_rpc(env, "mb_authenticate_agent", {"p_api_key": env["OPENCLAW_AGENT_KEY"]})
-    if resp.status_code == 200 and resp.json():
-        agent_info = resp.json()[0]
+    try:
+        agent_info = _authenticate(env)
+    except _AuthRequestError as e:
+        fail(f"Could not verify authentication: {e}")
+        return False
+    if agent_info:
         ok(f"Authentication verified: {agent_info['agent_name']} ({agent_info['agent_id']})")
         return True
     else:
-        fail(f"Authentication failed after registration: {resp.text[:200]}")
+        fail("Authentication failed after registration: check OPENCLAW_AGENT_KEY in .env")
         return False
 
 
@@ -425,31 +643,32 @@ def step_register() -> bool:
 def step_access() -> bool:
     """Grant this agent access to all existing kb_sources."""
     heading("Step 4: Bootstrap RAG Access")
-    import requests
 
     env = get_env()
-    headers = supabase_headers(env)
 
     # Get agent ID
-    resp = supabase_rpc(env, "mb_authenticate_agent", {"p_api_key": env["OPENCLAW_AGENT_KEY"]})
-    if resp.status_code != 200 or not resp.json():
+    try:
+        agent_info = _authenticate(env)
+    except _AuthRequestError as e:
+        fail(f"Authentication request failed: {e}")
+        return False
+    if not agent_info:
         fail("Cannot authenticate agent. Run step 3 first.")
         return False
 
-    agent_id = resp.json()[0]["agent_id"]
+    agent_id = agent_info["agent_id"]
 
-    # Check existing sources
-    resp = requests.get(
+    # Count existing sources (HEAD + count=exact: no rows are transferred)
+    resp = _get_session(env).head(
         f"{env['SUPABASE_URL']}/rest/v1/{env['TABLE_PREFIX']}_sources",
-        headers=headers,
-        params={"select": "id,url,title", "limit": "100"},
+        headers={"Prefer": "count=exact", "Range-Unit": "items", "Range": "0-0"},
         timeout=10,
     )
 
-    if resp.status_code == 200:
-        sources = resp.json()
-        if sources:
-            ok(f"Found {len(sources)} existing RAG sources")
+    total = resp.headers.get("content-range", "").rpartition("/")[2]
+    if resp.status_code in (200, 206) and total.isdigit():
+        if int(total) > 0:
+            ok(f"Found {total} existing RAG sources")
         else:
             warn("No existing RAG sources found (empty knowledgebase)")
             ok("Access bootstrap skipped (nothing to grant)")
@@ -460,7 +679,7 @@ def step_access() -> bool:
     # Bootstrap access
     resp = supabase_rpc(env, "mb_bootstrap_agent_access", {"p_agent_id": agent_id})
     if resp.status_code == 200:
-        count = resp.json()
+        count = loads(resp.content)
         if isinstance(count, int) and count > 0:
             ok(f"Granted global access to {count} RAG sources")
         elif isinstance(count, int) and count == 0:
@@ -469,7 +688,7 @@ def step_access() -> bool:
             ok(f"Access bootstrap completed (result: {count})")
         return True
     else:
-        fail(f"Bootstrap access failed: {resp.text[:200]}")
+        fail(f"Bootstrap access failed: {_err(resp, 200)}")
         return False
 
 
@@ -496,9 +715,9 @@ def step_test() -> bool:
     # Create client
     agent = AgentMemory(agent_name, api_key=agent_key)
 
-    # 5a. Authenticate
+    # 5a. Authenticate (bypass the on-disk cache: this must reach Supabase)
     try:
-        info = agent.authenticate()
+        info = agent.authenticate(force_refresh=True)
         ok(f"Authenticated as '{info.name}' ({info.id})")
     except Exception as e:
         fail(f"Authentication failed: {e}")
@@ -525,15 +744,20 @@ def step_test() -> bool:
         fail(f"remember() failed: {e}")
         return False
 
+    # 5c-5e. The reads are independent once the write has committed, so
+    # issue recall, recall_all and stats concurrently and report in order.
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        recall_future = ex.submit(
+            agent.recall, "bootstrap smoke test operational", limit=5, threshold=0.3,
+        )
+        recall_all_future = ex.submit(agent.recall_all, "bootstrap test", limit=5, threshold=0.3)
+        stats_future = ex.submit(agent.stats)
+
     # 5c. Recall (search for the memory)
     try:
-        results = agent.recall(
-            "bootstrap smoke test operational",
-            limit=5,
-            threshold=0.3,
-        )
-        found = any(r.id == memory.id for r in results)
-        if found:
+        results = recall_future.result()
+        result_ids = {r.id for r in results}
+        if memory.id in result_ids:
             ok(f"recall() OK — found test memory (similarity: {results[0].similarity:.3f})")
         elif results:
             warn(f"recall() returned {len(results)} results but test memory not in top 5")
@@ -547,19 +771,24 @@ def step_test() -> bool:
 
     # 5d. Recall all (unified search: memory + RAG)
     try:
-        combined = agent.recall_all(
-            "bootstrap test",
-            limit=5,
-            threshold=0.3,
-        )
-        memory_results = [r for r in combined if r.result_type == "memory"]
-        rag_results = [r for r in combined if r.result_type == "rag"]
-        ok(f"recall_all() OK — {len(memory_results)} memories, {len(rag_results)} RAG chunks")
+        combined = recall_all_future.result()
+        counts = Counter(r.result_type for r in combined)
+        ok(f"recall_all() OK — {counts['memory']} memories, {counts['rag']} RAG chunks")
     except Exception as e:
         fail(f"recall_all() failed: {e}")
         return False
 
-    # 5e. Forget (clean up test memory)
+    # 5e. Stats
+    try:
+        stats = stats_future.result()
+        if stats:
+            ok(f"stats() OK — {stats}")
+        else:
+            warn("stats() returned empty (may need RPC function)")
+    except Exception as e:
+        warn(f"stats() failed (non-critical): {e}")
+
+    # 5f. Forget (clean up test memory) — only after all reads are done
     try:
         deleted = agent.forget(memory.id)
         if deleted:
@@ -570,16 +799,6 @@ def step_test() -> bool:
         fail(f"forget() failed: {e}")
         return False
 
-    # 5f. Stats
-    try:
-        stats = agent.stats()
-        if stats:
-            ok(f"stats() OK — {stats}")
-        else:
-            warn("stats() returned empty (may need RPC function)")
-    except Exception as e:
-        warn(f"stats() failed (non-critical): {e}")
-
     ok("Smoke test completed successfully")
     return True
 
@@ -593,9 +812,12 @@ def step_summary() -> None:
     env = get_env()
 
     # Get agent info
-    resp = supabase_rpc(env, "mb_authenticate_agent", {"p_api_key": env["OPENCLAW_AGENT_KEY"]})
-    if resp.status_code == 200 and resp.json():
-        info = resp.json()[0]
+    try:
+        info = _authenticate(env)
+    except _AuthRequestError as e:
+        warn(f"Could not fetch agent info: {e}")
+        info = None
+    if info:
         print(f"  Agent name:    {info['agent_name']}")
         print(f"  Agent ID:      {info['agent_id']}")
         print(f"  Agent type:    {info.get('agent_type', 'openclaw')}")
@@ -645,11 +867,12 @@ def run_all() -> bool:
 
 
 def main():
-    if len(sys.argv) < 2:
+    args = [a for a in sys.argv[1:] if not a.startswith("-")]
+    if not args:
         print(__doc__)
         sys.exit(1)
 
-    command = sys.argv[1].lower()
+    command = args[0].lower()
 
     if command == "all":
         success = run_all()
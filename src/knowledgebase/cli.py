@@ -2,15 +2,14 @@
 
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import click
 from rich.console import Console
-from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
 
-from knowledgebase.config import get_config
-from knowledgebase.client import KnowledgeBase
-from knowledgebase.embeddings import get_embedding, test_connection, list_providers
-from knowledgebase.search import search, search_hybrid, format_results
+# Heavier modules (rich tables/progress, requests via the client and
+# embeddings) are imported inside the commands that need them so that
+# `kb --help` and `kb --version` start quickly.
 
 console = Console()
 
@@ -25,6 +24,12 @@ def main():
 @main.command()
 def status():
     """Check connection status and show statistics."""
+    from rich.table import Table
+
+    from knowledgebase.client import KnowledgeBase
+    from knowledgebase.config import get_config
+    from knowledgebase.embeddings import test_connection
+
     config = get_config()
 
     console.print("\n[bold]OpenClaw Knowledgebase Status[/bold]\n")
@@ -67,6 +72,8 @@ def status():
 @click.option("--hybrid", is_flag=True, help="Use hybrid search")
 def find(query: str, limit: int, threshold: float, hybrid: bool):
     """Search the knowledge base."""
+    from knowledgebase.search import search, search_hybrid
+
     console.print(f"\n🔍 Searching: [cyan]{query}[/cyan]\n")
 
     if hybrid:
@@ -78,22 +85,33 @@ def find(query: str, limit: int, threshold: float, hybrid: bool):
         console.print("[yellow]No results found.[/yellow]")
         return
 
+    # Build the whole listing first and render it in one print call
+    lines: list[str] = []
     for i, r in enumerate(results, 1):
         sim = r.get("similarity", 0)
         title = r.get("title") or "Untitled"
         url = r.get("url", "")
         content = r.get("content", "")[:300]
 
-        console.print(f"[bold]{i}.[/bold] [{sim:.2f}] [cyan]{title}[/cyan]")
-        console.print(f"   [dim]{url}[/dim]")
-        console.print(f"   {content}...")
-        console.print()
+        lines.append(f"[bold]{i}.[/bold] [{sim:.2f}] [cyan]{title}[/cyan]")
+        lines.append(f"   [dim]{url}[/dim]")
+        lines.append(f"   {content}...")
+        lines.append("")
+
+    console.print("\n".join(lines))
 
 
 @main.command()
 @click.option("--batch-size", default=50, help="Chunks per batch")
 def embed(batch_size: int):
     """Generate embeddings for chunks that don't have them."""
+    from rich.progress import BarColumn, Progress, SpinnerColumn, TaskProgressColumn, TextColumn
+
+    from knowledgebase.client import KnowledgeBase
+    from knowledgebase.config import get_config
+    from knowledgebase.embeddings import test_connection
+    from knowledgebase.embeddings_batcher import get_embedding_batched
+
     config = get_config()
     kb = KnowledgeBase()
 
@@ -114,6 +132,7 @@ def embed(batch_size: int):
 
     total_done = 0
     start_time = time.time()
+    last_desc_update = 0.0
 
     with Progress(
         SpinnerColumn(),
@@ -124,22 +143,39 @@ def embed(batch_size: int):
     ) as progress:
         task = progress.add_task("Embedding...", total=total_without)
 
-        while True:
-            chunks = kb.get_chunks_without_embeddings(limit=batch_size)
-            if not chunks:
-                break
-
-            for chunk in chunks:
-                embedding = get_embedding(chunk.content)
-                if embedding:
-                    kb.update_chunk_embedding(chunk.id, embedding)
-                    total_done += 1
-
-                progress.update(task, advance=1)
-
-                elapsed = time.time() - start_time
-                rate = total_done / elapsed if elapsed > 0 else 0
-                progress.update(task, description=f"Embedding... ({rate:.1f}/s)")
+        # One worker per chunk in a page: the batcher turns their
+        # concurrent calls into a few embed_batch() requests
+        with ThreadPoolExecutor(max_workers=max(1, batch_size)) as ex:
+            while True:
+                chunks = kb.get_chunks_without_embeddings(limit=batch_size)
+                if not chunks:
+                    break
+
+                # Embeddings are I/O-bound: request them concurrently and
+                # write them back in batches of 25 instead of one PATCH each
+                futures = {ex.submit(get_embedding_batched, c.content): c for c in chunks}
+                pending: list[tuple[int | str, list[float]]] = []
+
+                for future in as_completed(futures):
+                    embedding = future.result()
+                    if embedding:
+                        pending.append((futures[future].id, embedding))
+                        total_done += 1
+                    if len(pending) >= 25:
+                        kb.update_chunk_embeddings_batch(pending)
+                        pending = []
+
+                    progress.update(task, advance=1)
+
+                    # Refresh the rate text at most ~4 times a second
+                    elapsed = time.time() - start_time
+                    if elapsed - last_desc_update > 0.25:
+                        last_desc_update = elapsed
+                        rate = total_done / elapsed if elapsed > 0 else 0
+                        progress.update(task, description=f"Embedding... ({rate:.1f}/s)")
+
+                # Flush before refetching so written chunks aren't returned again
+                kb.update_chunk_embeddings_batch(pending)
 
     elapsed = time.time() - start_time
     console.print(f"\n[green]✅ Done![/green] {total_done} embeddings in {elapsed:.0f}s")
@@ -148,6 +184,10 @@ def embed(batch_size: int):
 @main.command()
 def sources():
     """List all sources in the knowledge base."""
+    from rich.table import Table
+
+    from knowledgebase.client import KnowledgeBase
+
     kb = KnowledgeBase()
     src_list = kb.list_sources()
 
@@ -175,6 +215,9 @@ def sources():
 @main.command()
 def providers():
     """List available embedding providers."""
+    from knowledgebase.config import get_config
+    from knowledgebase.embeddings import list_providers
+
     config = get_config()
     active = config.embedding_provider
 
@@ -1,14 +1,127 @@
 """Supabase client for OpenClaw Knowledgebase."""
 
+import math
+import operator
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
+
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Any, Iterator
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from urllib3.util.retry import Retry
 
 from knowledgebase.config import get_config, Config
-from knowledgebase.embeddings import get_embedding
+from knowledgebase.embeddings import get_embedding, get_embeddings_packed
+from knowledgebase.fastjson import dumps, loads
+from knowledgebase.quantize import quantize_int8
+
+# Optional import - ijson parses streamed search responses incrementally
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+
+# Columns that map onto Source fields (rows may carry extra columns)
+_SOURCE_FIELDS = frozenset({
+    "id", "url", "title", "source_type", "metadata", "description", "created_at", "updated_at",
+})
+
+
+# Per-request header overrides (merged with the session headers by requests)
+_COUNT_EXACT_HEADERS = {"Prefer": "count=exact"}
+_COUNT_PLANNED_HEADERS = {"Prefer": "count=planned"}
+_RETURN_REPRESENTATION_HEADERS = {"Prefer": "return=representation"}
+_UPSERT_SOURCES_HEADERS = {"Prefer": "return=representation,resolution=merge-duplicates"}
+
+
+class _NoEmbeddingError(Exception):
+    """Raised inside the query cache so failed lookups are not memoized."""
+
 
+@lru_cache(maxsize=2048)
+def _cached_query_embedding(provider: str, model: str, query: str) -> tuple[float, ...]:
+    """Embed a search query, memoized per (provider, model, query)."""
+    embedding = get_embedding(query)
+    if not embedding:
+        raise _NoEmbeddingError(query)
+    return tuple(embedding)
 
-@dataclass
+
+def _query_embedding(config: Config, query: str) -> tuple[float, ...] | None:
+    """Return the (cached) embedding for a search query, or None on failure."""
+    try:
+        return _cached_query_embedding(config.embedding_provider, config.embedding_model, query)
+    except _NoEmbeddingError:
+        return None
+
+
+class _SemanticQueryCache:
+    """Results of recent searches, looked up by query-embedding similarity.
+    
+    Near-duplicate queries ("reset my password" / "password reset") return
+    the stored chunks instead of running the Supabase RPC again. Entries
+    only match searches of the same kind, model, table and parameters, and
+    the oldest entry is evicted once `maxlen` is reached.
+    
+    Stored vectors are int8-quantized (one byte per dimension instead of a
+    boxed float); they are only compared locally, never sent to Supabase.
+    """
+    
+    def __init__(self, maxlen: int = 512):
+        self._entries: deque = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _normalize(vec) -> tuple[float, ...] | None:
+        norm = math.sqrt(sum(map(operator.mul, vec, vec)))
+        if norm == 0:
+            return None
+        return tuple(x / norm for x in vec)
+    
+    def get(self, key: tuple, embedding, limit: int, threshold: float) -> list | None:
+        """Return cached results for a similar query, or None on a miss."""
+        unit = self._normalize(embedding)
+        if unit is None:
+            return None
+        with self._lock:
+            entries = list(self._entries)
+        best, best_sim = None, threshold
+        for entry_key, codes, scale, entry_limit, results in entries:
+            if entry_key != key or entry_limit < limit:
+                continue
+            sim = sum(map(operator.mul, unit, codes)) * scale
+            if sim >= best_sim:
+                best, best_sim = results, sim
+        return None if best is None else best[:limit]
+    
+    def put(self, key: tuple, embedding, limit: int, results: list) -> None:
+        """Store results for a query embedding (normalized on insert)."""
+        unit = self._normalize(embedding)
+        if unit is not None and results:
+            codes, scale = quantize_int8(unit)
+            with self._lock:
+                self._entries.append((key, codes, scale, limit, results))
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_query_cache = _SemanticQueryCache()
+
+
+def clear_query_cache() -> None:
+    """Drop all cached search results (e.g. after ingesting new content)."""
+    _query_cache.clear()
+
+
+@dataclass(slots=True)
 class Source:
     """A knowledge source (URL or document)."""
     id: int | str  # Can be int or UUID depending on schema
@@ -26,7 +139,7 @@ class Source:
             self.metadata = {}
 
 
-@dataclass  
+@dataclass(slots=True)
 class Chunk:
     """A text chunk with optional embedding."""
     id: int | str  # Can be int or UUID
@@ -39,11 +152,26 @@ class Chunk:
     # Optional fields from search results (joined from source)
     url: str | None = None
     title: str | None = None
+    # Alias of chunk_index for compatibility (a plain slot, set on init)
+    chunk_number: int = field(default=0, init=False, repr=False, compare=False)
     
-    # Alias for compatibility
-    @property
-    def chunk_number(self) -> int:
-        return self.chunk_index
+    def __post_init__(self):
+        self.chunk_number = self.chunk_index
+
+
+def _as_vector(embedding) -> list[float]:
+    """Return a JSON-serializable vector.
+    
+    Accepts lists/tuples as well as array types such as numpy arrays
+    (converted via .tolist() only here, at serialization time).
+    """
+    tolist = getattr(embedding, "tolist", None)
+    return tolist() if tolist is not None else embedding
+
+
+def _source_from_row(row: dict) -> Source:
+    """Build a Source from a table row, ignoring columns it doesn't know."""
+    return Source(**{k: row[k] for k in _SOURCE_FIELDS & row.keys()})
 
 
 class KnowledgeBase:
@@ -60,6 +188,44 @@ class KnowledgeBase:
         # Table names with configurable prefix
         self._sources_table = f"{self.config.table_prefix}_sources"
         self._chunks_table = f"{self.config.table_prefix}_chunks"
+        
+        # Request URLs, built once rather than formatted on every call
+        prefix = self.config.table_prefix
+        self._rest_base = f"{self.config.supabase_url}/rest/v1"
+        self._url_sources = f"{self._rest_base}/{self._sources_table}"
+        self._url_chunks = f"{self._rest_base}/{self._chunks_table}"
+        self._url_rpc_semantic = f"{self._rest_base}/rpc/{prefix}_search_semantic"
+        self._url_rpc_hybrid = f"{self._rest_base}/rpc/{prefix}_search_hybrid"
+        self._url_rpc_stats = f"{self._rest_base}/rpc/{prefix}_stats"
+        self._url_rpc_update_embeddings = f"{self._rest_base}/rpc/{prefix}_update_embeddings"
+        self._url_rpc_match_documents = f"{self._rest_base}/rpc/match_documents"
+        
+        # One pooled keep-alive session per client: every call reuses the
+        # same TCP/TLS connections instead of handshaking again
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=64,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=(429, 502, 503, 504),
+                raise_on_status=False,
+            ),
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._session.headers.update(self._headers)
+    
+    def close(self) -> None:
+        """Close the underlying HTTP session."""
+        self._session.close()
+    
+    def __enter__(self) -> "KnowledgeBase":
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
     
     def _request(
         self,
@@ -69,19 +235,27 @@ class KnowledgeBase:
         params: dict | None = None,
         return_representation: bool = False,
     ) -> requests.Response:
-        """Make a request to Supabase REST API."""
-        url = f"{self.config.supabase_url}/rest/v1/{endpoint}"
-        headers = dict(self._headers)
+        """Make a request to Supabase REST API.
+        
+        `endpoint` is a path under /rest/v1 (e.g. a table name) or one of
+        the precomputed absolute URLs.
+        """
+        if endpoint.startswith(("http://", "https://")):
+            url = endpoint
+        else:
+            url = f"{self._rest_base}/{endpoint}"
+        headers = None
         
         # For POST/PATCH, request the created/updated row back
+        # (merged with the session headers by requests)
         if return_representation and method in ("POST", "PATCH"):
-            headers["Prefer"] = "return=representation"
+            headers = _RETURN_REPRESENTATION_HEADERS
         
-        return requests.request(
+        return self._session.request(
             method,
             url,
             headers=headers,
-            json=data,
+            data=dumps(data) if data is not None else None,
             params=params,
             timeout=30,
         )
@@ -96,51 +270,114 @@ class KnowledgeBase:
         metadata: dict | None = None,
     ) -> Source | None:
         """Add a new source to the knowledgebase."""
-        data = {
-            "url": url,
-            "title": title,
-            "source_type": source_type,
-            "metadata": metadata or {},
-        }
+        sources = self.add_sources_batch(
+            [{"url": url, "title": title, "source_type": source_type, "metadata": metadata}],
+            upsert=False,
+        )
+        return sources[0] if sources else None
+    
+    def add_sources_batch(self, rows: list[dict], upsert: bool = True) -> list[Source]:
+        """Add multiple sources in one request. Returns the stored sources.
+        
+        Each row needs a "url" and may set "title", "source_type" and
+        "metadata". With upsert=True, rows whose URL already exists update
+        that source (on_conflict=url) instead of failing the whole batch.
+        """
+        if not rows:
+            return []
+        
+        # PostgREST bulk inserts need every object to have the same keys
+        data = [
+            {
+                "url": r["url"],
+                "title": r.get("title"),
+                "source_type": r.get("source_type") or "web",
+                "metadata": r.get("metadata") or {},
+            }
+            for r in rows
+        ]
+        
+        params = None
+        headers = _RETURN_REPRESENTATION_HEADERS
+        if upsert:
+            params = {"on_conflict": "url"}
+            headers = _UPSERT_SOURCES_HEADERS
         
-        resp = self._request("POST", self._sources_table, data=data, return_representation=True)
-        if resp.status_code == 201:
+        resp = self._session.post(
+            self._url_sources,
+            data=dumps(data),
+            params=params,
+            headers=headers,
+            timeout=30,
+        )
+        if resp.status_code in (200, 201):
             try:
-                result = resp.json()
-                if result:
-                    row = result[0] if isinstance(result, list) else result
-                    known_fields = {"id", "url", "title", "source_type", "metadata", "description", "created_at", "updated_at"}
-                    filtered = {k: v for k, v in row.items() if k in known_fields}
-                    return Source(**filtered)
+                result = loads(resp.content)
+                if isinstance(result, dict):
+                    result = [result]
+                return [_source_from_row(row) for row in result or []]
             except Exception:
                 pass
-        return None
+        return []
     
     def get_source(self, url: str) -> Source | None:
         """Get a source by URL."""
-        resp = self._request("GET", self._sources_table, params={"url": f"eq.{url}"})
+        resp = self._request("GET", self._url_sources, params={"url": f"eq.{url}"})
         if resp.status_code == 200:
-            result = resp.json()
+            result = loads(resp.content)
             if result:
-                s = result[0]
-                known_fields = {"id", "url", "title", "source_type", "metadata", "description", "created_at", "updated_at"}
-                filtered = {k: v for k, v in s.items() if k in known_fields}
-                return Source(**filtered)
+                return _source_from_row(result[0])
         return None
     
     def list_sources(self, limit: int = 100) -> list[Source]:
         """List all sources."""
-        resp = self._request("GET", self._sources_table, params={"limit": str(limit)})
+        resp = self._request("GET", self._url_sources, params={"limit": str(limit)})
         if resp.status_code == 200:
-            sources = []
-            for s in resp.json():
-                # Filter to known fields only
-                known_fields = {"id", "url", "title", "source_type", "metadata", "description", "created_at", "updated_at"}
-                filtered = {k: v for k, v in s.items() if k in known_fields}
-                sources.append(Source(**filtered))
-            return sources
+            return [_source_from_row(s) for s in loads(resp.content)]
         return []
     
+    def iter_sources(self, page: int = 1000) -> Iterator[Source]:
+        """Iterate over all sources, fetching `page` rows per request.
+        
+        Uses PostgREST Range headers, so no single response holds the whole
+        table and the caller can stop early.
+        """
+        offset = 0
+        while True:
+            resp = self._session.get(
+                self._url_sources,
+                params={"order": "id"},
+                headers={
+                    "Range-Unit": "items",
+                    "Range": f"{offset}-{offset + page - 1}",
+                },
+                timeout=30,
+            )
+            if resp.status_code not in (200, 206):
+                return
+            rows = loads(resp.content)
+            for row in rows:
+                yield _source_from_row(row)
+            
+            # Only a short page ends the scan; an estimated total can be
+            # below the real row count (e.g. before ANALYZE)
+            if len(rows) < page:
+                return
+            offset += len(rows)
+    
+    def count_sources(self, exact: bool = True) -> int:
+        """Count sources without fetching any rows."""
+        resp = self._session.head(
+            self._url_sources,
+            headers=_COUNT_EXACT_HEADERS if exact else _COUNT_PLANNED_HEADERS,
+            params={"select": "id"},
+            timeout=10,
+        )
+        try:
+            return int(resp.headers.get("content-range", "0-0/0").rpartition("/")[2])
+        except ValueError:
+            return 0
+    
     # --- Chunks ---
     
     def add_chunk(
@@ -171,10 +408,11 @@ class KnowledgeBase:
             data["url"] = url
         if title:
             data["title"] = title
-        if embedding:
-            data["embedding"] = embedding
+        if embedding is not None and len(embedding):
+            data["embedding"] = _as_vector(embedding)
         
-        resp = self._request("POST", self._chunks_table, data=data)
+        resp = self._request("POST", self._url_chunks, data=data)
+        _query_cache.clear()  # cached search results may now be stale
         return resp.status_code == 201
     
     def add_chunks_batch(self, chunks: list[dict]) -> int:
@@ -182,7 +420,8 @@ class KnowledgeBase:
         if not chunks:
             return 0
             
-        resp = self._request("POST", self._chunks_table, data=chunks)
+        resp = self._request("POST", self._url_chunks, data=chunks)
+        _query_cache.clear()  # cached search results may now be stale
         if resp.status_code in (200, 201):
             return len(chunks)
         return 0
@@ -191,7 +430,7 @@ class KnowledgeBase:
         """Get chunks that need embeddings."""
         resp = self._request(
             "GET",
-            self._chunks_table,
+            self._url_chunks,
             params={
                 "embedding": "is.null",
                 "select": "id,source_id,chunk_index,content,metadata",
@@ -200,7 +439,7 @@ class KnowledgeBase:
         )
         if resp.status_code == 200:
             chunks = []
-            for c in resp.json():
+            for c in loads(resp.content):
                 chunks.append(Chunk(
                     id=c["id"],
                     source_id=c["source_id"],
@@ -212,44 +451,137 @@ class KnowledgeBase:
             return chunks
         return []
     
+    def iter_chunks_without_embeddings(self, page: int = 500) -> Iterator[Chunk]:
+        """Iterate over all chunks that need embeddings, `page` rows per request.
+        
+        Pages by id (keyset) rather than offset, so rows that get embedded
+        while iterating don't shift later pages.
+        """
+        last_id = None
+        while True:
+            params = {
+                "embedding": "is.null",
+                "select": "id,source_id,chunk_index,content,metadata",
+                "order": "id",
+            }
+            if last_id is not None:
+                params["id"] = f"gt.{last_id}"
+            resp = self._session.get(
+                self._url_chunks,
+                params=params,
+                headers={"Range-Unit": "items", "Range": f"0-{page - 1}"},
+                timeout=30,
+            )
+            if resp.status_code not in (200, 206):
+                return
+            rows = loads(resp.content)
+            for c in rows:
+                yield Chunk(
+                    id=c["id"],
+                    source_id=c["source_id"],
+                    content=c["content"],
+                    chunk_index=c.get("chunk_index", 0),
+                    metadata=c.get("metadata"),
+                    embedding=None,
+                )
+            
+            if len(rows) < page:
+                return
+            last_id = rows[-1]["id"]
+    
     def update_chunk_embedding(self, chunk_id: int, embedding: list[float]) -> bool:
-        """Update a chunk's embedding."""
+        """Update a chunk's embedding (one PATCH; use update_chunk_embeddings_batch for bulk)."""
         resp = self._request(
             "PATCH",
-            self._chunks_table,
-            data={"embedding": embedding},
+            self._url_chunks,
+            data={"embedding": _as_vector(embedding)},
             params={"id": f"eq.{chunk_id}"},
         )
         return resp.status_code in (200, 204)
     
-    def count_chunks(self, with_embeddings: bool | None = None) -> int:
-        """Count chunks, optionally filtered by embedding status."""
+    def update_chunk_embeddings_batch(
+        self,
+        pairs: list[tuple[int | str, list[float]]],
+        batch_size: int = 500,
+    ) -> int:
+        """Update many chunk embeddings at once. Returns number updated.
+        
+        Prefer this over calling update_chunk_embedding in a loop: it sends
+        one {prefix}_update_embeddings RPC per `batch_size` rows (keeping
+        requests under Supabase's body size limit) instead of one PATCH per
+        chunk. Falls back to per-chunk PATCHes when the function isn't
+        installed.
+        """
+        if not pairs:
+            return 0
+        _query_cache.clear()  # cached search results may now be stale
+        
+        updated = 0
+        for i in range(0, len(pairs), batch_size):
+            batch = pairs[i:i + batch_size]
+            resp = self._request(
+                "POST",
+                self._url_rpc_update_embeddings,
+                data={
+                    "updates": [{"id": cid, "embedding": _as_vector(emb)} for cid, emb in batch],
+                },
+            )
+            if resp.status_code == 200:
+                result = loads(resp.content)
+                updated += result if isinstance(result, int) else len(batch)
+            else:
+                updated += sum(1 for cid, emb in batch if self.update_chunk_embedding(cid, emb))
+        return updated
+    
+    def embed_pending(self, batch: int = 64) -> int:
+        """Embed every chunk that has no embedding yet. Returns number updated.
+        
+        Each page of `batch` chunks costs one provider batch call and one
+        bulk update; the update of a page runs in the background while the
+        next page is embedded.
+        """
+        updated = 0
+        pending_write = None
+        chunks_iter = self.iter_chunks_without_embeddings(page=batch)
+        
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            while chunks := list(islice(chunks_iter, batch)):
+                # Packed float32 vectors: a page waiting on the background
+                # write holds 4 bytes per dimension instead of boxed floats
+                embeddings = get_embeddings_packed([c.content for c in chunks])
+                pairs = [(c.id, emb) for c, emb in zip(chunks, embeddings) if emb]
+                
+                if pending_write is not None:
+                    updated += pending_write.result()
+                pending_write = writer.submit(self.update_chunk_embeddings_batch, pairs)
+            
+            if pending_write is not None:
+                updated += pending_write.result()
+        return updated
+    
+    def count_chunks(self, with_embeddings: bool | None = None, exact: bool = True) -> int:
+        """Count chunks, optionally filtered by embedding status.
+        
+        With exact=False the planner's estimate is used (count=planned),
+        which avoids a full count(*) scan on very large tables.
+        """
         params = {"select": "id"}
         if with_embeddings is True:
             params["embedding"] = "not.is.null"
         elif with_embeddings is False:
             params["embedding"] = "is.null"
         
-        resp = self._request(
-            "GET",
-            self._chunks_table,
-            params={**params, "limit": "1"},
-        )
-        resp.headers.get("content-range", "0-0/0")
-        
-        # Use HEAD with Prefer: count=exact for accurate count
-        headers = {**self._headers, "Prefer": "count=exact"}
-        resp = requests.head(
-            f"{self.config.supabase_url}/rest/v1/{self._chunks_table}",
-            headers=headers,
+        # HEAD + Prefer: count transfers no rows, only the Content-Range total
+        resp = self._session.head(
+            self._url_chunks,
+            headers=_COUNT_EXACT_HEADERS if exact else _COUNT_PLANNED_HEADERS,
             params=params,
             timeout=10,
         )
         
-        content_range = resp.headers.get("content-range", "0-0/0")
         try:
-            return int(content_range.split("/")[1])
-        except (IndexError, ValueError):
+            return int(resp.headers.get("content-range", "0-0/0").rpartition("/")[2])
+        except ValueError:  # e.g. "*/*" when the count is unknown
             return 0
     
     # --- Search ---
@@ -271,29 +603,36 @@ class KnowledgeBase:
         Returns:
             List of matching chunks with similarity scores
         """
-        embedding = get_embedding(query)
+        # Repeated queries skip the embedding provider round trip
+        embedding = _query_embedding(self.config, query)
         if not embedding:
             return []
         
         limit = limit or self.config.default_match_count
         threshold = threshold or self.config.similarity_threshold
         
+        cache_threshold = self.config.query_cache_threshold
+        cache_key = ("semantic", self.config.embedding_model, self._chunks_table, threshold)
+        if cache_threshold > 0:
+            cached = _query_cache.get(cache_key, embedding, limit, cache_threshold)
+            if cached is not None:
+                return cached
+        
         # Try RPC function first (for schemas that have it)
-        resp = requests.post(
-            f"{self.config.supabase_url}/rest/v1/rpc/{self.config.table_prefix}_search_semantic",
-            headers=self._headers,
-            json={
+        resp = self._session.post(
+            self._url_rpc_semantic,
+            data=dumps({
                 "query_embedding": embedding,
                 "match_count": limit,
                 "similarity_threshold": threshold,
-            },
+            }),
             timeout=30,
         )
         
         if resp.status_code == 200:
-            results = resp.json()
+            results = loads(resp.content)
             if results:  # Only use if we got results
-                return [
+                chunks = [
                     Chunk(
                         id=r["id"],
                         source_id=r.get("source_id", ""),
@@ -305,22 +644,80 @@ class KnowledgeBase:
                     )
                     for r in results
                 ]
+                if cache_threshold > 0:
+                    _query_cache.put(cache_key, embedding, limit, chunks)
+                return chunks
+        
+        return self._search_semantic_fallback(embedding, limit, threshold)
+    
+    def isearch_semantic(
+        self,
+        query: str,
+        limit: int | None = None,
+        threshold: float | None = None,
+    ) -> Iterator[Chunk]:
+        """
+        Semantic search that yields chunks as the response is read.
+        
+        With ijson installed, large result sets are parsed incrementally
+        instead of buffering the whole body, and callers can stop early.
+        Results bypass the semantic query cache.
+        """
+        embedding = _query_embedding(self.config, query)
+        if not embedding:
+            return
+        
+        limit = limit or self.config.default_match_count
+        threshold = threshold or self.config.similarity_threshold
+        
+        found = False
+        with self._session.post(
+            self._url_rpc_semantic,
+            data=dumps({
+                "query_embedding": embedding,
+                "match_count": limit,
+                "similarity_threshold": threshold,
+            }),
+            timeout=30,
+            stream=True,
+        ) as resp:
+            if resp.status_code == 200:
+                if HAS_IJSON:
+                    resp.raw.decode_content = True  # undo gzip before parsing
+                    rows = ijson.items(resp.raw, "item", use_float=True)
+                else:
+                    rows = loads(resp.content)
+                for r in rows:
+                    found = True
+                    yield Chunk(
+                        id=r["id"],
+                        source_id=r.get("source_id", ""),
+                        content=r["content"],
+                        chunk_index=r.get("chunk_index", 0),
+                        url=r.get("url"),
+                        title=r.get("title"),
+                        similarity=r.get("similarity"),
+                    )
         
+        if not found:
+            yield from self._search_semantic_fallback(embedding, limit, threshold)
+    
+    def _search_semantic_fallback(self, embedding, limit: int, threshold: float) -> list[Chunk]:
+        """Semantic search for schemas without the {prefix}_search_semantic RPC."""
         # Fallback: direct vector search using match_documents function
         # This is a simpler function that just does cosine similarity
-        fallback_resp = requests.post(
-            f"{self.config.supabase_url}/rest/v1/rpc/match_documents",
-            headers=self._headers,
-            json={
+        fallback_resp = self._session.post(
+            self._url_rpc_match_documents,
+            data=dumps({
                 "query_embedding": embedding,
                 "match_count": limit,
                 "filter": {},
-            },
+            }),
             timeout=30,
         )
         
         if fallback_resp.status_code == 200:
-            results = fallback_resp.json()
+            results = loads(fallback_resp.content)
             if results:
                 return [
                     Chunk(
@@ -353,28 +750,37 @@ class KnowledgeBase:
         Returns:
             List of matching chunks with combined scores
         """
-        embedding = get_embedding(query)
+        # Repeated queries skip the embedding provider round trip
+        embedding = _query_embedding(self.config, query)
         if not embedding:
             return []
         
         limit = limit or self.config.default_match_count
         semantic_weight = semantic_weight or self.config.semantic_weight
         
-        resp = requests.post(
-            f"{self.config.supabase_url}/rest/v1/rpc/{self.config.table_prefix}_search_hybrid",
-            headers=self._headers,
-            json={
+        # Hybrid scores also depend on the query text's keywords, so the
+        # cache only helps for paraphrases the threshold deems equivalent
+        cache_threshold = self.config.query_cache_threshold
+        cache_key = ("hybrid", self.config.embedding_model, self._chunks_table, semantic_weight)
+        if cache_threshold > 0:
+            cached = _query_cache.get(cache_key, embedding, limit, cache_threshold)
+            if cached is not None:
+                return cached
+        
+        resp = self._session.post(
+            self._url_rpc_hybrid,
+            data=dumps({
                 "query_embedding": embedding,
                 "query_text": query,
                 "match_count": limit,
                 "semantic_weight": semantic_weight,
-            },
+            }),
             timeout=30,
         )
         
         if resp.status_code == 200:
-            results = resp.json()
-            return [
+            results = loads(resp.content)
+            chunks = [
                 Chunk(
                     id=r["id"],
                     source_id=r.get("source_id", ""),
@@ -386,6 +792,9 @@ class KnowledgeBase:
                 )
                 for r in results
             ]
+            if cache_threshold > 0:
+                _query_cache.put(cache_key, embedding, limit, chunks)
+            return chunks
         return []
     
     # --- Stats ---
@@ -393,24 +802,29 @@ class KnowledgeBase:
     def stats(self) -> dict:
         """Get knowledgebase statistics."""
         # Try RPC function first
-        resp = requests.post(
-            f"{self.config.supabase_url}/rest/v1/rpc/{self.config.table_prefix}_stats",
-            headers=self._headers,
-            json={},
+        resp = self._session.post(
+            self._url_rpc_stats,
+            data=b"{}",
             timeout=10,
         )
         
         if resp.status_code == 200:
-            result = resp.json()
+            result = loads(resp.content)
             if result:
                 return result[0] if isinstance(result, list) else result
         
-        # Fallback: count manually
-        total_chunks = self.count_chunks()
-        with_embeddings = self.count_chunks(with_embeddings=True)
+        # Fallback: count manually. The three lookups are independent, so
+        # run them concurrently over the pooled session (one RTT, not three)
+        with ThreadPoolExecutor(max_workers=3) as ex:
+            total_future = ex.submit(self.count_chunks)
+            with_emb_future = ex.submit(self.count_chunks, with_embeddings=True)
+            sources_future = ex.submit(self.count_sources)
+            total_chunks = total_future.result()
+            with_embeddings = with_emb_future.result()
+            total_sources = sources_future.result()
         
         return {
-            "total_sources": len(self.list_sources()),
+            "total_sources": total_sources,
             "total_chunks": total_chunks,
             "chunks_with_embeddings": with_embeddings,
             "chunks_without_embeddings": total_chunks - with_embeddings,
@@ -418,7 +832,7 @@ class KnowledgeBase:
     
     def _search_vector_direct(
         self,
-        query_embedding: list[float],
+        query_embedding: list[float] | tuple[float, ...],
         limit: int = 10,
         threshold: float = 0.5,
     ) -> list[Chunk]:
@@ -427,8 +841,6 @@ class KnowledgeBase:
         Fetches chunks and computes similarity client-side.
         Note: This is slower than using a proper pgvector function.
         """
-        import math
-        
         def cosine_similarity(a: list[float], b: list[float]) -> float:
             """Compute cosine similarity between two vectors."""
             dot = sum(x * y for x, y in zip(a, b))
@@ -442,7 +854,7 @@ class KnowledgeBase:
         # This is a fallback, so we accept some limitations
         resp = self._request(
             "GET",
-            self._chunks_table,
+            self._url_chunks,
             params={
                 "select": "id,source_id,chunk_index,content,embedding",
                 "embedding": "not.is.null",
@@ -453,7 +865,7 @@ class KnowledgeBase:
         if resp.status_code != 200:
             return []
         
-        chunks_data = resp.json()
+        chunks_data = loads(resp.content)
         
         # Compute similarities
         results = []
@@ -464,9 +876,10 @@ class KnowledgeBase:
             
             # Parse embedding if it's a string (Supabase returns vectors as strings)
             if isinstance(emb, str):
-                # Format: "[0.1,0.2,...]"
+                # Format: "[0.1,0.2,...]" is a JSON array, so let the JSON
+                # parser build the floats instead of split() + float()
                 try:
-                    emb = [float(x) for x in emb.strip("[]").split(",")]
+                    emb = loads(emb)
                 except:
                     continue
             
@@ -6,6 +6,8 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
+__all__ = ["Config", "get_config", "set_config", "reload_config"]
+
 
 def _load_env_cascade(local_env: str | Path | None = None) -> None:
     """Load environment variables with cascade, never overriding existing.
@@ -51,6 +53,17 @@ class Config:
     embedding_model: str = "nomic-embed-text"
     embedding_dimensions: int = 768
     embedding_timeout: int = 120  # seconds
+    # Persistent SQLite cache of computed embeddings (see embeddings_cache)
+    embedding_cache_enabled: bool = False
+    embedding_cache_path: str = ""  # empty = ~/.cache/openclaw-kb/embeddings.db
+    embedding_cache_fuzzy: bool = False  # also reuse near-duplicate texts' vectors
+    embedding_cache_quantize: bool = False  # store int8 codes + scale (~4x smaller)
+    embedding_memory_cache_size: int = 512  # in-process LRU entries (0 = off)
+    # get_embedding_batched() coalescing window (see embeddings_batcher)
+    embedding_microbatch_ms: float = 20.0
+    embedding_microbatch_max: int = 64
+    # Seconds to reuse an embedding provider test_connection() result (0 = off)
+    health_check_ttl: float = 30.0
 
     # Ollama-specific
     ollama_url: str = "http://localhost:11434"
@@ -70,36 +83,29 @@ class Config:
     default_match_count: int = 10
     similarity_threshold: float = 0.5
     semantic_weight: float = 0.7
+    # Reuse results of a recent query whose embedding has at least this
+    # cosine similarity (e.g. 0.86). 0 disables the semantic query cache.
+    query_cache_threshold: float = 0.0
 
     # OpenClaw Memory Module (optional — empty = legacy single-tenant mode)
     agent_name: str = ""
     agent_api_key: str = ""
+    # Seconds to reuse a successful authenticate() from disk (0 = off)
+    agent_auth_cache_ttl: float = 86400.0
 
     @classmethod
     def from_env(cls, env_file: str | Path | None = None) -> "Config":
         """Load configuration from environment variables."""
         _load_env_cascade(env_file)
 
-        return cls(
-            supabase_url=os.getenv("SUPABASE_URL", ""),
-            supabase_key=os.getenv("SUPABASE_KEY", ""),
-            table_prefix=os.getenv("TABLE_PREFIX", "kb"),
-            embedding_provider=os.getenv("EMBEDDING_PROVIDER", "ollama"),
-            embedding_model=os.getenv("EMBEDDING_MODEL", "nomic-embed-text"),
-            embedding_dimensions=int(os.getenv("EMBEDDING_DIMENSIONS", "768")),
-            embedding_timeout=int(os.getenv("EMBEDDING_TIMEOUT", "120")),
-            ollama_url=os.getenv("OLLAMA_URL", "http://localhost:11434"),
-            google_api_key=os.getenv("GOOGLE_API_KEY", ""),
-            openai_api_key=os.getenv("OPENAI_API_KEY", ""),
-            openai_base_url=os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1"),
-            chunk_size=int(os.getenv("CHUNK_SIZE", "1000")),
-            chunk_overlap=int(os.getenv("CHUNK_OVERLAP", "200")),
-            default_match_count=int(os.getenv("DEFAULT_MATCH_COUNT", "10")),
-            similarity_threshold=float(os.getenv("SIMILARITY_THRESHOLD", "0.5")),
-            semantic_weight=float(os.getenv("SEMANTIC_WEIGHT", "0.7")),
-            agent_name=os.getenv("OPENCLAW_AGENT_NAME", ""),
-            agent_api_key=os.getenv("OPENCLAW_AGENT_KEY", ""),
-        )
+        environ = os.environ
+        values = {}
+        for name, env_key, cast in _ENV_SCHEMA:
+            raw = environ.get(env_key)
+            if raw is not None:
+                values[name] = cast(raw)
+        # Unset variables fall back to the dataclass defaults
+        return cls(**values)
 
     def validate(self) -> list[str]:
         """Validate configuration, return list of errors."""
@@ -118,19 +124,56 @@ class Config:
         return errors
 
 
+def _env_bool(value: str) -> bool:
+    """Parse a boolean environment variable (1/true/yes/on)."""
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# (field, environment variable, type) for every setting read by from_env
+_ENV_SCHEMA: tuple[tuple[str, str, type], ...] = (
+    ("supabase_url", "SUPABASE_URL", str),
+    ("supabase_key", "SUPABASE_KEY", str),
+    ("table_prefix", "TABLE_PREFIX", str),
+    ("embedding_provider", "EMBEDDING_PROVIDER", str),
+    ("embedding_model", "EMBEDDING_MODEL", str),
+    ("embedding_dimensions", "EMBEDDING_DIMENSIONS", int),
+    ("embedding_timeout", "EMBEDDING_TIMEOUT", int),
+    ("embedding_cache_enabled", "EMBEDDING_CACHE", _env_bool),
+    ("embedding_cache_path", "EMBEDDING_CACHE_PATH", str),
+    ("embedding_cache_fuzzy", "EMBEDDING_CACHE_FUZZY", _env_bool),
+    ("embedding_cache_quantize", "EMBEDDING_CACHE_QUANTIZE", _env_bool),
+    ("embedding_memory_cache_size", "EMBEDDING_MEMORY_CACHE_SIZE", int),
+    ("embedding_microbatch_ms", "EMBEDDING_MICROBATCH_MS", float),
+    ("embedding_microbatch_max", "EMBEDDING_MICROBATCH_MAX", int),
+    ("health_check_ttl", "HEALTH_CHECK_TTL", float),
+    ("ollama_url", "OLLAMA_URL", str),
+    ("google_api_key", "GOOGLE_API_KEY", str),
+    ("openai_api_key", "OPENAI_API_KEY", str),
+    ("openai_base_url", "OPENAI_BASE_URL", str),
+    ("chunk_size", "CHUNK_SIZE", int),
+    ("chunk_overlap", "CHUNK_OVERLAP", int),
+    ("default_match_count", "DEFAULT_MATCH_COUNT", int),
+    ("similarity_threshold", "SIMILARITY_THRESHOLD", float),
+    ("semantic_weight", "SEMANTIC_WEIGHT", float),
+    ("query_cache_threshold", "QUERY_CACHE_THRESHOLD", float),
+    ("agent_name", "OPENCLAW_AGENT_NAME", str),
+    ("agent_api_key", "OPENCLAW_AGENT_KEY", str),
+    ("agent_auth_cache_ttl", "OPENCLAW_AUTH_CACHE_TTL", float),
+)
+
 # Global config instance
 _config: Config | None = None
 
-# Cache dict for external clearing
+# Cache dict for external clearing (any key forces a reload)
 _config_cache: dict = {}
 
 
 def get_config() -> Config:
     """Get or create global config instance."""
     global _config
-    if _config is None or "reload" in _config_cache:
+    if _config is None or _config_cache:
         _config = Config.from_env()
-        _config_cache.pop("reload", None)
+        _config_cache.clear()
     return _config
 
 
@@ -142,5 +185,6 @@ def set_config(config: Config) -> None:
 
 def reload_config() -> Config:
     """Force reload config from environment."""
-    _config_cache["reload"] = True
+    global _config
+    _config = None
     return get_config()
@@ -18,12 +18,19 @@ Adding a new provider:
 from __future__ import annotations
 
 import abc
+import functools
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Callable, Iterator
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from knowledgebase.config import get_config
+from knowledgebase.fastjson import dumps, loads
 from knowledgebase.log import get_logger
 
 logger = get_logger(__name__)
@@ -41,17 +48,75 @@ def register_provider(name: str):
     return decorator
 
 
+# name -> (config it was built from, provider instance)
+_provider_cache: dict[str, tuple[Any, EmbeddingProvider]] = {}
+
+
+def reset_providers() -> None:
+    """Drop cached provider instances (they are rebuilt on next use)."""
+    _provider_cache.clear()
+    _test_cache.clear()
+
+
 def get_provider(name: str | None = None) -> EmbeddingProvider:
-    """Get an initialized provider by name (default: from config)."""
+    """Get an initialized provider by name (default: from config).
+
+    Instances are reused while the global config object is unchanged;
+    reload_config()/set_config() install a new object, which rebuilds them.
+    """
     config = get_config()
     name = name or config.embedding_provider
+    cached = _provider_cache.get(name)
+    if cached is not None and cached[0] is config:
+        return cached[1]
+
     cls = _providers.get(name)
     if cls is None:
         available = ", ".join(sorted(_providers.keys()))
         raise ValueError(
             f"Unknown embedding provider '{name}'. Available: {available}"
         )
-    return cls(config)
+    provider = cls(config)
+    if config.embedding_cache_enabled:
+        from knowledgebase.embeddings_cache import CachedProvider
+        provider = CachedProvider(provider)
+    _provider_cache[name] = (config, provider)
+    return provider
+
+
+# ── Batch helpers ────────────────────────────────────────────────────
+
+def _chunk_batches(texts: list[str], max_batch: int) -> list[list[str]]:
+    """Split texts into consecutive slices of at most max_batch items."""
+    return [texts[i:i + max_batch] for i in range(0, len(texts), max_batch)]
+
+
+def _iter_batches_concurrent(
+    batches: list[list[str]],
+    fn: Callable[[list[str]], list[list[float] | None]],
+    max_inflight: int = 4,
+) -> Iterator[tuple[int, list[float] | None]]:
+    """Run fn over each batch with bounded parallelism.
+
+    Yields (index into the flattened input, embedding) as each batch
+    finishes, so callers can consume results before all batches are done.
+    """
+    offsets = []
+    offset = 0
+    for batch in batches:
+        offsets.append(offset)
+        offset += len(batch)
+
+    if len(batches) <= 1:
+        for batch in batches:
+            yield from enumerate(fn(batch))
+        return
+    with ThreadPoolExecutor(max_workers=min(max_inflight, len(batches))) as ex:
+        futures = {ex.submit(fn, batch): start for batch, start in zip(batches, offsets)}
+        for future in as_completed(futures):
+            start = futures[future]
+            for i, emb in enumerate(future.result()):
+                yield start + i, emb
 
 
 # ── Base class ───────────────────────────────────────────────────────
@@ -61,6 +126,24 @@ class EmbeddingProvider(abc.ABC):
 
     def __init__(self, config: Any):
         self.config = config
+        # Keep-alive session so repeated calls reuse TCP/TLS connections.
+        # Embedding requests are idempotent, so POSTs are retried too.
+        self._session = requests.Session()
+        # Bodies are pre-encoded with fastjson (orjson when installed)
+        self._session.headers["Content-Type"] = "application/json"
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=64,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=None,
+                raise_on_status=False,
+            ),
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
 
     @abc.abstractmethod
     def embed(self, text: str) -> list[float] | None:
@@ -71,10 +154,27 @@ class EmbeddingProvider(abc.ABC):
         """Generate embeddings for multiple texts.
 
         Default implementation calls embed() sequentially.
-        Providers with native batch support should override this.
+        Providers with native batch support should override this
+        (or iter_embed_batch).
         """
         return [self.embed(t) for t in texts]
 
+    def iter_embed_batch(self, texts: list[str]) -> Iterator[tuple[int, list[float] | None]]:
+        """Yield (index, embedding) pairs, possibly out of order, as they are ready.
+
+        Lets callers write results out per sub-batch instead of holding every
+        vector for a large input at once.
+        """
+        for i, text in enumerate(texts):
+            yield i, self.embed(text)
+
+    def _collect(self, texts: list[str]) -> list[list[float] | None]:
+        """embed_batch() built on iter_embed_batch(), in input order."""
+        results: list[list[float] | None] = [None] * len(texts)
+        for i, emb in self.iter_embed_batch(texts):
+            results[i] = emb
+        return results
+
     @abc.abstractmethod
     def test_connection(self) -> tuple[bool, str]:
         """Test provider connectivity. Returns (ok, message)."""
@@ -93,7 +193,23 @@ class EmbeddingProvider(abc.ABC):
 
     def _truncate(self, text: str) -> str:
         """Truncate text to max_chars."""
-        return text[:self.max_chars] if len(text) > self.max_chars else text
+        # Slicing past the end returns the same str object, no copy or len()
+        return text[:self.max_chars]
+
+    def _prepare_batch(self, texts: list[str]) -> tuple[list[str], list[int]]:
+        """Drop blank texts and truncate the rest in one pass.
+
+        Returns (kept texts, their indices in `texts`) so results can be
+        scattered back to the right positions.
+        """
+        max_chars = self.max_chars
+        kept: list[str] = []
+        kept_indices: list[int] = []
+        for i, t in enumerate(texts):
+            if t.strip():
+                kept.append(t[:max_chars])
+                kept_indices.append(i)
+        return kept, kept_indices
 
 
 # ── Ollama provider ─────────────────────────────────────────────────
@@ -101,6 +217,12 @@ class EmbeddingProvider(abc.ABC):
 @register_provider("ollama")
 class OllamaProvider(EmbeddingProvider):
 
+    MAX_BATCH = 256  # /api/embed has no hard limit; keep request bodies modest
+
+    # Whether the server has the multi-input /api/embed endpoint (Ollama
+    # 0.3.4+); None until the first batch request finds out
+    _supports_batch: bool | None = None
+
     @property
     def name(self) -> str:
         return "Ollama"
@@ -115,25 +237,70 @@ class OllamaProvider(EmbeddingProvider):
         if not text.strip():
             return None
         try:
-            resp = requests.post(
+            resp = self._session.post(
                 f"{self.config.ollama_url}/api/embeddings",
-                json={"model": self.config.embedding_model, "prompt": text},
+                data=dumps({"model": self.config.embedding_model, "prompt": text}),
                 timeout=self.config.embedding_timeout,
             )
             resp.raise_for_status()
-            embedding = resp.json().get("embedding")
+            embedding = loads(resp.content).get("embedding")
             return embedding if embedding else None
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.warning("Ollama embedding failed: %s", e)
             return None
 
+    def embed_batch(self, texts: list[str]) -> list[list[float] | None]:
+        """Ollama 0.3.4+ embeds many inputs per /api/embed call."""
+        return self._collect(texts)
+
+    def iter_embed_batch(self, texts: list[str]) -> Iterator[tuple[int, list[float] | None]]:
+        if self._supports_batch is False:
+            yield from super().iter_embed_batch(texts)
+            return
+        yield from _iter_batches_concurrent(
+            _chunk_batches(texts, self.MAX_BATCH), self._embed_batch_request
+        )
+
+    def _embed_batch_request(self, texts: list[str]) -> list[list[float] | None]:
+        """One /api/embed call; falls back per text for this batch only."""
+        if self._supports_batch is False:
+            return [self.embed(t) for t in texts]
+        kept, kept_indices = self._prepare_batch(texts)
+        results: list[list[float] | None] = [None] * len(texts)
+        if not kept:
+            return results
+        try:
+            resp = self._session.post(
+                f"{self.config.ollama_url}/api/embed",
+                data=dumps({"model": self.config.embedding_model, "input": kept}),
+                timeout=self.config.embedding_timeout,
+            )
+            # Older servers answer unknown routes with a plain-text 404/405;
+            # a missing model is also a 404 but comes with a JSON error body
+            if resp.status_code in (404, 405) and b'"error"' not in resp.content[:200]:
+                if self._supports_batch is None:
+                    logger.info("Ollama has no /api/embed, using /api/embeddings per text")
+                self._supports_batch = False
+                return [self.embed(t) for t in texts]
+            resp.raise_for_status()
+            self._supports_batch = True
+            embeddings = loads(resp.content).get("embeddings", [])
+            if len(embeddings) != len(kept):
+                raise ValueError(f"got {len(embeddings)} embeddings for {len(kept)} inputs")
+            for i, emb in zip(kept_indices, embeddings):
+                results[i] = emb or None
+            return results
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.warning("Ollama batch embedding failed, falling back: %s", e)
+            return [self.embed(t) for t in texts]
+
     def test_connection(self) -> tuple[bool, str]:
         try:
-            resp = requests.get(
+            resp = self._session.get(
                 f"{self.config.ollama_url}/api/tags", timeout=5
             )
             resp.raise_for_status()
-            models = resp.json().get("models", [])
+            models = loads(resp.content).get("models", [])
             names = [m.get("name", "").split(":")[0] for m in models]
             if self.config.embedding_model not in names:
                 return False, (
@@ -145,7 +312,7 @@ class OllamaProvider(EmbeddingProvider):
             )
         except requests.exceptions.ConnectionError:
             return False, f"Cannot connect to Ollama at {self.config.ollama_url}"
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             return False, f"Ollama error: {e}"
 
 
@@ -155,6 +322,7 @@ class OllamaProvider(EmbeddingProvider):
 class GoogleProvider(EmbeddingProvider):
 
     ENDPOINT = "https://generativelanguage.googleapis.com/v1beta/models"
+    MAX_BATCH = 100  # batchEmbedContents request limit
 
     @property
     def name(self) -> str:
@@ -176,52 +344,64 @@ class GoogleProvider(EmbeddingProvider):
             logger.error("GOOGLE_API_KEY not set")
             return None
         try:
-            resp = requests.post(
+            resp = self._session.post(
                 self._url("embedContent"),
-                json={
+                data=dumps({
                     "model": f"models/{self.config.embedding_model}",
                     "content": {"parts": [{"text": text}]},
                     **({"outputDimensionality": self.config.embedding_dimensions}
                        if self.config.embedding_dimensions else {}),
-                },
+                }),
                 timeout=self.config.embedding_timeout,
             )
             resp.raise_for_status()
-            values = resp.json().get("embedding", {}).get("values")
+            values = loads(resp.content).get("embedding", {}).get("values")
             return values if values else None
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.warning("Google embedding failed: %s", e)
             return None
 
     def embed_batch(self, texts: list[str]) -> list[list[float] | None]:
-        """Google supports native batch embedding."""
+        """Google supports native batch embedding (up to 100 per request)."""
+        return self._collect(texts)
+
+    def iter_embed_batch(self, texts: list[str]) -> Iterator[tuple[int, list[float] | None]]:
         if not self.config.google_api_key:
-            return [None] * len(texts)
+            yield from enumerate([None] * len(texts))
+            return
+        yield from _iter_batches_concurrent(
+            _chunk_batches(texts, self.MAX_BATCH), self._embed_batch_request
+        )
+
+    def _embed_batch_request(self, texts: list[str]) -> list[list[float] | None]:
+        """One batchEmbedContents call; falls back per text for this batch only."""
+        kept, kept_indices = self._prepare_batch(texts)
+        results: list[list[float] | None] = [None] * len(texts)
+        if not kept:
+            return results
         requests_payload = [
             {
                 "model": f"models/{self.config.embedding_model}",
-                "content": {"parts": [{"text": self._truncate(t)}]},
+                "content": {"parts": [{"text": t}]},
                 **({"outputDimensionality": self.config.embedding_dimensions}
                    if self.config.embedding_dimensions else {}),
             }
-            for t in texts
-            if t.strip()
+            for t in kept
         ]
-        if not requests_payload:
-            return [None] * len(texts)
         try:
-            resp = requests.post(
+            resp = self._session.post(
                 self._url("batchEmbedContents"),
-                json={"requests": requests_payload},
+                data=dumps({"requests": requests_payload}),
                 timeout=self.config.embedding_timeout,
             )
             resp.raise_for_status()
-            embeddings = resp.json().get("embeddings", [])
-            return [
-                e.get("values") if e else None
-                for e in embeddings
-            ]
-        except requests.exceptions.RequestException as e:
+            embeddings = loads(resp.content).get("embeddings", [])
+            if len(embeddings) != len(kept):
+                raise ValueError(f"got {len(embeddings)} embeddings for {len(kept)} inputs")
+            for i, e in zip(kept_indices, embeddings):
+                results[i] = e.get("values") if e else None
+            return results
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.warning("Google batch embedding failed, falling back: %s", e)
             return [self.embed(t) for t in texts]
 
@@ -229,22 +409,22 @@ class GoogleProvider(EmbeddingProvider):
         if not self.config.google_api_key:
             return False, "GOOGLE_API_KEY not set"
         try:
-            resp = requests.post(
+            resp = self._session.post(
                 self._url("embedContent"),
-                json={
+                data=dumps({
                     "model": f"models/{self.config.embedding_model}",
                     "content": {"parts": [{"text": "test"}]},
-                },
+                }),
                 timeout=10,
             )
             if resp.status_code == 200:
-                dims = len(resp.json().get("embedding", {}).get("values", []))
+                dims = len(loads(resp.content).get("embedding", {}).get("values", []))
                 return True, (
                     f"Google AI OK, model '{self.config.embedding_model}' "
                     f"({dims} dimensions)"
                 )
             return False, f"Google AI error: HTTP {resp.status_code} — {resp.text[:200]}"
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             return False, f"Google AI error: {e}"
 
 
@@ -253,6 +433,8 @@ class GoogleProvider(EmbeddingProvider):
 @register_provider("openai")
 class OpenAIProvider(EmbeddingProvider):
 
+    MAX_BATCH = 2048  # /embeddings input array limit
+
     @property
     def name(self) -> str:
         return "OpenAI"
@@ -284,43 +466,59 @@ class OpenAIProvider(EmbeddingProvider):
             }
             if self.config.embedding_dimensions:
                 body["dimensions"] = self.config.embedding_dimensions
-            resp = requests.post(
+            resp = self._session.post(
                 f"{self._base_url()}/embeddings",
                 headers=self._headers(),
-                json=body,
+                data=dumps(body),
                 timeout=self.config.embedding_timeout,
             )
             resp.raise_for_status()
-            data = resp.json().get("data", [])
+            data = loads(resp.content).get("data", [])
             return data[0]["embedding"] if data else None
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.warning("OpenAI embedding failed: %s", e)
             return None
 
     def embed_batch(self, texts: list[str]) -> list[list[float] | None]:
-        """OpenAI supports native batch embedding."""
+        """OpenAI supports native batch embedding (up to 2048 inputs per request)."""
+        return self._collect(texts)
+
+    def iter_embed_batch(self, texts: list[str]) -> Iterator[tuple[int, list[float] | None]]:
         if not self.config.openai_api_key:
-            return [None] * len(texts)
-        truncated = [self._truncate(t) for t in texts if t.strip()]
-        if not truncated:
-            return [None] * len(texts)
+            yield from enumerate([None] * len(texts))
+            return
+        yield from _iter_batches_concurrent(
+            _chunk_batches(texts, self.MAX_BATCH), self._embed_batch_request
+        )
+
+    def _embed_batch_request(self, texts: list[str]) -> list[list[float] | None]:
+        """One /embeddings call; falls back per text for this batch only."""
+        kept, kept_indices = self._prepare_batch(texts)
+        results: list[list[float] | None] = [None] * len(texts)
+        if not kept:
+            return results
         try:
             body: dict = {
                 "model": self.config.embedding_model,
-                "input": truncated,
+                "input": kept,
             }
             if self.config.embedding_dimensions:
                 body["dimensions"] = self.config.embedding_dimensions
-            resp = requests.post(
+            resp = self._session.post(
                 f"{self._base_url()}/embeddings",
                 headers=self._headers(),
-                json=body,
+                data=dumps(body),
                 timeout=self.config.embedding_timeout,
             )
             resp.raise_for_status()
-            data = resp.json().get("data", [])
-            return [d["embedding"] for d in data]
-        except requests.exceptions.RequestException as e:
+            data = loads(resp.content).get("data", [])
+            if len(data) != len(kept):
+                raise ValueError(f"got {len(data)} embeddings for {len(kept)} inputs")
+            # Each item carries the position of its input; don't rely on order
+            for pos, d in enumerate(data):
+                results[kept_indices[d.get("index", pos)]] = d["embedding"]
+            return results
+        except (requests.exceptions.RequestException, ValueError, LookupError) as e:
             logger.warning("OpenAI batch embedding failed, falling back: %s", e)
             return [self.embed(t) for t in texts]
 
@@ -328,21 +526,21 @@ class OpenAIProvider(EmbeddingProvider):
         if not self.config.openai_api_key:
             return False, "OPENAI_API_KEY not set"
         try:
-            resp = requests.post(
+            resp = self._session.post(
                 f"{self._base_url()}/embeddings",
                 headers=self._headers(),
-                json={"model": self.config.embedding_model, "input": "test"},
+                data=dumps({"model": self.config.embedding_model, "input": "test"}),
                 timeout=10,
             )
             if resp.status_code == 200:
-                data = resp.json().get("data", [])
+                data = loads(resp.content).get("data", [])
                 dims = len(data[0]["embedding"]) if data else 0
                 return True, (
                     f"OpenAI OK, model '{self.config.embedding_model}' "
                     f"({dims} dimensions)"
                 )
             return False, f"OpenAI error: HTTP {resp.status_code} — {resp.text[:200]}"
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             return False, f"OpenAI error: {e}"
 
 
@@ -361,6 +559,31 @@ class CustomProvider(OpenAIProvider):
         return f"Custom ({self.config.openai_base_url})"
 
 
+# ── In-memory cache ──────────────────────────────────────────────────
+
+# Longer texts are document chunks that are rarely embedded twice per run
+_MAX_CACHED_CHARS = 4000
+
+_embed_cached = None  # lru_cache-wrapped _embed_uncached, sized from config
+
+
+class _EmbeddingError(Exception):
+    """Raised inside the cached function so failures are not memoized."""
+
+
+def _embed_uncached(provider_name: str, model: str, text: str) -> tuple[float, ...]:
+    embedding = get_provider(provider_name).embed(text)
+    if not embedding:
+        raise _EmbeddingError(provider_name)
+    return tuple(embedding)
+
+
+def clear_embedding_cache() -> None:
+    """Drop in-memory cached embeddings (e.g. after switching model)."""
+    if _embed_cached is not None:
+        _embed_cached.cache_clear()
+
+
 # ── Public API (backwards-compatible) ────────────────────────────────
 
 def get_embedding(text: str, **kwargs) -> list[float] | None:
@@ -376,15 +599,26 @@ def get_embedding(text: str, **kwargs) -> list[float] | None:
     Returns:
         List of floats (embedding vector) or None on error.
     """
-    provider = get_provider()
-    return provider.embed(text)
+    global _embed_cached
+    config = get_config()
+    if not text or len(text) > _MAX_CACHED_CHARS:
+        return get_provider().embed(text)
+
+    if _embed_cached is None:
+        _embed_cached = functools.lru_cache(
+            maxsize=config.embedding_memory_cache_size
+        )(_embed_uncached)
+    try:
+        return list(_embed_cached(config.embedding_provider, config.embedding_model, text))
+    except _EmbeddingError:
+        return None
 
 
 def get_embeddings_batch(texts: list[str], **kwargs) -> list[list[float] | None]:
     """Generate embeddings for multiple texts.
 
     Uses native batch API if the provider supports it,
-    otherwise falls back to sequential calls.
+    otherwise falls back to sequential calls. Repeated texts are sent once.
 
     Args:
         texts: List of texts to embed.
@@ -394,24 +628,80 @@ def get_embeddings_batch(texts: list[str], **kwargs) -> list[list[float] | None]
         List of embedding vectors (or None for failed embeddings).
     """
     provider = get_provider()
-    return provider.embed_batch(texts)
+    unique = list(dict.fromkeys(texts))
+    if len(unique) == len(texts):
+        return provider.embed_batch(texts)
+
+    by_text = dict(zip(unique, provider.embed_batch(unique)))
+    # Copies, so callers mutating one result don't change its duplicates
+    return [list(emb) if (emb := by_text.get(t)) else None for t in texts]
+
+
+def get_embeddings_packed(texts: list[str]) -> list[array | None]:
+    """Generate embeddings as packed float32 arrays (array('f')).
+
+    4 bytes per dimension instead of a boxed Python float, and each
+    sub-batch's lists are released as soon as they are packed. numpy users
+    can wrap a result without copying: np.frombuffer(vec, dtype=np.float32).
+    KnowledgeBase write methods accept these arrays directly.
+
+    Returns:
+        List of packed vectors (or None for failed embeddings), in input order.
+    """
+    results: list[array | None] = [None] * len(texts)
+    for i, emb in get_provider().iter_embed_batch(texts):
+        results[i] = array("f", emb) if emb else None
+    return results
 
 
-def test_connection(provider_name: str | None = None) -> tuple[bool, str]:
+def iter_embeddings_batch(texts: list[str]) -> Iterator[tuple[int, list[float] | None]]:
+    """Yield (index, embedding) pairs as the provider produces them.
+
+    Order is not guaranteed; use the index to match results to texts.
+    """
+    return get_provider().iter_embed_batch(texts)
+
+
+# name -> (provider instance, monotonic time checked, result)
+_test_cache: dict[str, tuple[EmbeddingProvider, float, tuple[bool, str]]] = {}
+
+
+def test_connection(
+    provider_name: str | None = None, force_refresh: bool = False
+) -> tuple[bool, str]:
     """Test the embedding provider connection.
 
+    Results are reused for HEALTH_CHECK_TTL seconds (per provider instance,
+    so a config reload re-checks), which keeps polling dashboards from
+    hitting the provider on every refresh.
+
     Args:
         provider_name: Override provider (default: from config).
+        force_refresh: Ignore any cached result.
 
     Returns:
         Tuple of (success, message).
     """
     try:
         provider = get_provider(provider_name)
-        return provider.test_connection()
     except ValueError as e:
         return False, str(e)
 
+    ttl = provider.config.health_check_ttl
+    name = provider_name or provider.config.embedding_provider
+    cached = _test_cache.get(name)
+    now = time.monotonic()
+    if (
+        not force_refresh and cached is not None
+        and cached[0] is provider and now - cached[1] < ttl
+    ):
+        return cached[2]
+
+    result = provider.test_connection()
+    if ttl > 0:
+        _test_cache[name] = (provider, now, result)
+    return result
+
 
 # Backwards-compatible alias
 test_ollama_connection = test_connection
@@ -0,0 +1,181 @@
+"""Micro-batching of single-text embedding calls for OpenClaw Knowledgebase.
+
+Callers that embed one text at a time (e.g. per chunk, from several
+threads) pay one HTTP round-trip per text. DynamicBatcher collects those
+calls for a few milliseconds and sends them as one embed_batch() request.
+
+Usage:
+    from knowledgebase.embeddings_batcher import get_embedding_batched
+    vec = get_embedding_batched("some text")   # blocks until its batch returns
+
+Tuned via environment:
+    EMBEDDING_MICROBATCH_MS=20   max time the first queued text waits for company
+    EMBEDDING_MICROBATCH_MAX=64  texts per batch (sent early once reached)
+
+get_embedding() is unchanged; only callers of get_embedding_batched() opt in
+(`kb embed` does).
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+
+from knowledgebase.config import get_config
+from knowledgebase.embeddings import EmbeddingProvider, get_provider
+from knowledgebase.log import get_logger
+
+logger = get_logger(__name__)
+
+_STOP = object()
+
+
+class DynamicBatcher:
+    """Coalesce concurrent single-text requests into embed_batch() calls.
+
+    A daemon thread takes the first queued text, then keeps collecting until
+    max_batch_size texts are waiting or max_latency_ms has passed, and
+    resolves every caller's future from the one batch result.
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[list[str]], list[list[float] | None]],
+        max_batch_size: int = 64,
+        max_latency_ms: float = 20.0,
+    ):
+        self.embed_batch = embed_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_latency = max(0.0, max_latency_ms) / 1000
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        # Held while queueing so nothing can land behind the stop marker
+        self._lock = threading.Lock()
+
+    def submit(self, text: str) -> Future:
+        """Queue text; the returned future resolves to its embedding (or None).
+
+        Raises RuntimeError once close() has been called.
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("DynamicBatcher is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="kb-embed-batcher", daemon=True
+                )
+                self._thread.start()
+            self._queue.put((text, future))
+        return future
+
+    def embed(self, text: str) -> list[float] | None:
+        """Blocking single-text embed through the batcher."""
+        return self.submit(text).result()
+
+    def close(self) -> None:
+        """Stop the worker thread once the already queued texts are sent."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._thread is not None:
+                self._queue.put(_STOP)
+
+    def _run(self) -> None:
+        get = self._queue.get
+        while True:
+            item = get()
+            if item is _STOP:
+                self._drain()
+                return
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.max_latency
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if stop:
+                self._drain()
+                return
+
+    def _drain(self) -> None:
+        """Send whatever was queued around close() so no caller hangs."""
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftover.append(item)
+        for i in range(0, len(leftover), self.max_batch_size):
+            self._flush(leftover[i:i + self.max_batch_size])
+
+    def _flush(self, batch: list[tuple[str, Future]]) -> None:
+        texts = [text for text, _ in batch]
+        try:
+            embeddings = self.embed_batch(texts)
+            if len(embeddings) != len(texts):
+                raise ValueError(f"got {len(embeddings)} embeddings for {len(texts)} texts")
+        except Exception as e:
+            # Don't leave callers blocked forever on a provider bug
+            logger.warning("Micro-batch of %d texts failed: %s", len(texts), e)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), emb in zip(batch, embeddings):
+            future.set_result(emb)
+
+
+# Shared batcher for the active provider; replaced when the provider changes
+_batcher: DynamicBatcher | None = None
+_batcher_provider: EmbeddingProvider | None = None
+_batcher_lock = threading.Lock()
+
+
+def get_batcher() -> DynamicBatcher:
+    """Return the process-wide batcher for the configured provider."""
+    global _batcher, _batcher_provider
+    provider = get_provider()
+    with _batcher_lock:
+        if _batcher is None or _batcher_provider is not provider:
+            if _batcher is not None:
+                _batcher.close()
+            config = get_config()
+            _batcher = DynamicBatcher(
+                provider.embed_batch,
+                max_batch_size=config.embedding_microbatch_max,
+                max_latency_ms=config.embedding_microbatch_ms,
+            )
+            _batcher_provider = provider
+        return _batcher
+
+
+def get_embedding_batched(text: str) -> list[float] | None:
+    """Like get_embedding(), but shares one batch request with concurrent callers.
+
+    Returns None for empty text or when the embedding fails.
+    """
+    if not text or not text.strip():
+        return None
+    batcher = get_batcher()
+    try:
+        return batcher.embed(text)
+    except Exception:
+        # Already logged by the batcher
+        return None
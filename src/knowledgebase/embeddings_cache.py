@@ -0,0 +1,287 @@
+"""Persistent embedding cache for OpenClaw Knowledgebase.
+
+Wraps any EmbeddingProvider so identical inputs are only sent to the
+remote API once, across sessions. Vectors are stored as float32 blobs in a
+SQLite database, keyed by a SHA-256 of (provider, model, dimensions, text).
+
+Enabled via environment:
+    EMBEDDING_CACHE=1                       (default: off)
+    EMBEDDING_CACHE_PATH=/path/to/cache.db  (default: ~/.cache/openclaw-kb/embeddings.db)
+    EMBEDDING_CACHE_FUZZY=1                 (default: off) also reuse the
+        embedding of a near-identical text (typo fixes, whitespace edits),
+        found via a 64-bit SimHash and confirmed by a >= 95% similarity ratio
+    EMBEDDING_CACHE_QUANTIZE=1              (default: off) store new vectors as
+        int8 codes plus a float32 scale, ~4x smaller than float32
+
+get_provider() applies the wrapper automatically when enabled.
+"""
+
+from __future__ import annotations
+
+import difflib
+import hashlib
+import re
+import sqlite3
+import threading
+from array import array
+from collections import Counter
+from pathlib import Path
+
+from knowledgebase.embeddings import EmbeddingProvider
+from knowledgebase.log import get_logger
+from knowledgebase.quantize import quantize_int8
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "openclaw-kb" / "embeddings.db"
+
+# SQLite's default limit on bound parameters per statement is 999
+_SQL_BATCH = 500
+
+# Near-duplicate matching: SimHash Hamming radius and text similarity floor.
+# Four 16-bit bands guarantee any hash within 3 bits shares a whole band.
+_SIMHASH_MAX_DISTANCE = 3
+_FUZZY_MIN_RATIO = 0.95
+_BANDS = 4
+
+_WS_RE = re.compile(r"\s+")
+
+# One connection per database file, shared by all providers and threads
+_connections: dict[str, sqlite3.Connection] = {}
+_lock = threading.Lock()
+
+
+def _connect(path: str | Path) -> sqlite3.Connection:
+    """Return the shared connection for a cache file (created on first use)."""
+    path = str(Path(path).expanduser())
+    conn = _connections.get(path)
+    if conn is None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(key BLOB PRIMARY KEY, vec BLOB NOT NULL, dim INTEGER NOT NULL)"
+        )
+        _connections[path] = conn
+    return conn
+
+
+def _quantize(vec: list[float]) -> bytes:
+    """Pack vec as a float32 scale followed by symmetric int8 codes."""
+    codes, scale = quantize_int8(vec)
+    return array("f", [scale]).tobytes() + codes.tobytes()
+
+
+def _unpack(blob: bytes, dim: int) -> list[float]:
+    """Decode a stored vector; float32 and quantized rows can be mixed."""
+    if len(blob) == 4 * dim:
+        vec = array("f")
+        vec.frombytes(blob)
+        return vec.tolist()
+    scale = array("f", blob[:4])[0]
+    codes = array("b")
+    codes.frombytes(blob[4:])
+    return [c * scale for c in codes]
+
+
+def _normalize(text: str) -> str:
+    """Lowercase, strip and collapse whitespace before signing."""
+    return _WS_RE.sub(" ", text.strip().lower())
+
+
+def _simhash(text: str) -> int:
+    """64-bit SimHash over character 3-gram shingles."""
+    weights = [0] * 64
+    grams = Counter(text[i:i + 3] for i in range(max(len(text) - 2, 1)))
+    for gram, count in grams.items():
+        h = int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += count if h >> bit & 1 else -count
+    return sum(1 << bit for bit, w in enumerate(weights) if w > 0)
+
+
+def _to_signed(h: int) -> int:
+    """SQLite INTEGER is signed 64-bit."""
+    return h - (1 << 64) if h >= 1 << 63 else h
+
+
+class CachedProvider(EmbeddingProvider):
+    """EmbeddingProvider decorator backed by a SQLite cache.
+
+    Only cache misses are sent to the wrapped provider; failed (None)
+    embeddings are not stored.
+    """
+
+    def __init__(self, inner: EmbeddingProvider, path: str | Path | None = None):
+        # No super().__init__(): all HTTP goes through the wrapped provider
+        self.config = inner.config
+        self.inner = inner
+        with _lock:
+            self._conn = _connect(path or inner.config.embedding_cache_path or DEFAULT_CACHE_PATH)
+        config = inner.config
+        self._key_prefix = (
+            f"{config.embedding_provider}\0{config.embedding_model}\0"
+            f"{config.embedding_dimensions}\0"
+        ).encode("utf-8")
+
+        self._quantize = bool(getattr(config, "embedding_cache_quantize", False))
+        self._fuzzy = bool(getattr(config, "embedding_cache_fuzzy", False))
+        # band index -> band value -> [(simhash, key)], for this provider/model only
+        self._bands: list[dict[int, list[tuple[int, bytes]]]] = [{} for _ in range(_BANDS)]
+        if self._fuzzy:
+            self._load_sim_index()
+
+    def _load_sim_index(self) -> None:
+        with _lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sim_index "
+                "(key BLOB PRIMARY KEY, ns BLOB NOT NULL, simhash INTEGER NOT NULL, "
+                "text TEXT NOT NULL)"
+            )
+            rows = self._conn.execute(
+                "SELECT simhash, key FROM sim_index WHERE ns = ?", (self._key_prefix,)
+            ).fetchall()
+        for h, key in rows:
+            self._index(h & 0xFFFFFFFFFFFFFFFF, key)
+
+    def _index(self, h: int, key: bytes) -> None:
+        for band in range(_BANDS):
+            value = h >> (band * 16) & 0xFFFF
+            self._bands[band].setdefault(value, []).append((h, key))
+
+    def _fuzzy_lookup(self, text: str) -> list[float] | None:
+        """Embedding of a previously cached near-duplicate of text, if any."""
+        norm = _normalize(text)
+        h = _simhash(norm)
+        seen: set[bytes] = set()
+        for band in range(_BANDS):
+            for other, key in self._bands[band].get(h >> (band * 16) & 0xFFFF, ()):
+                if key in seen or (h ^ other).bit_count() > _SIMHASH_MAX_DISTANCE:
+                    continue
+                seen.add(key)
+                with _lock:
+                    row = self._conn.execute(
+                        "SELECT text FROM sim_index WHERE key = ?", (key,)
+                    ).fetchone()
+                if row is None:
+                    continue
+                matcher = difflib.SequenceMatcher(None, norm, row[0], autojunk=False)
+                if (
+                    matcher.quick_ratio() >= _FUZZY_MIN_RATIO
+                    and matcher.ratio() >= _FUZZY_MIN_RATIO
+                ):
+                    vec = self._lookup([key]).get(key)
+                    if vec is not None:
+                        return vec
+        return None
+
+    def _store_sim(self, items: list[tuple[bytes, str]]) -> None:
+        rows = []
+        for key, text in items:
+            norm = _normalize(text)
+            h = _simhash(norm)
+            self._index(h, key)
+            rows.append((key, self._key_prefix, _to_signed(h), norm))
+        try:
+            with _lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO sim_index (key, ns, simhash, text) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+        except sqlite3.Error as e:
+            logger.warning("Embedding cache write failed: %s", e)
+
+    @property
+    def name(self) -> str:
+        return self.inner.name
+
+    @property
+    def max_chars(self) -> int:
+        return self.inner.max_chars
+
+    def test_connection(self) -> tuple[bool, str]:
+        return self.inner.test_connection()
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.sha256(self._key_prefix + text.encode("utf-8")).digest()
+
+    def _lookup(self, keys: list[bytes]) -> dict[bytes, list[float]]:
+        found: dict[bytes, list[float]] = {}
+        with _lock:
+            for i in range(0, len(keys), _SQL_BATCH):
+                batch = keys[i:i + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vec, dim FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob, dim in rows:
+                    found[key] = _unpack(blob, dim)
+        return found
+
+    def _store(self, items: list[tuple[bytes, list[float]]]) -> None:
+        if not items:
+            return
+        pack = _quantize if self._quantize else (lambda vec: array("f", vec).tobytes())
+        rows = [(key, pack(vec), len(vec)) for key, vec in items]
+        try:
+            with _lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vec, dim) VALUES (?, ?, ?)", rows
+                )
+        except sqlite3.Error as e:
+            logger.warning("Embedding cache write failed: %s", e)
+
+    def embed(self, text: str) -> list[float] | None:
+        if not text.strip():
+            return None
+        key = self._key(text)
+        hit = self._lookup([key]).get(key)
+        if hit is None and self._fuzzy:
+            hit = self._fuzzy_lookup(text)
+        if hit is not None:
+            return hit
+        embedding = self.inner.embed(text)
+        if embedding:
+            self._store([(key, embedding)])
+            if self._fuzzy:
+                self._store_sim([(key, text)])
+        return embedding
+
+    def iter_embed_batch(self, texts: list[str]):
+        # Cache lookups are per batch, so resolve the whole batch at once
+        yield from enumerate(self.embed_batch(texts))
+
+    def embed_batch(self, texts: list[str]) -> list[list[float] | None]:
+        keys = [self._key(t) for t in texts]
+        found = self._lookup(keys)
+
+        miss_idx = [i for i, k in enumerate(keys) if k not in found]
+        results: list[list[float] | None] = [found.get(k) for k in keys]
+        if self._fuzzy and miss_idx:
+            for i in miss_idx:
+                if texts[i].strip():
+                    results[i] = self._fuzzy_lookup(texts[i])
+            miss_idx = [i for i in miss_idx if results[i] is None]
+        if not miss_idx:
+            return results
+
+        embeddings = self.inner.embed_batch([texts[i] for i in miss_idx])
+        if len(embeddings) != len(miss_idx):
+            # Can't tell which result belongs to which text; don't cache
+            logger.warning(
+                "Provider returned %d embeddings for %d texts", len(embeddings), len(miss_idx)
+            )
+            embeddings = [self.inner.embed(texts[i]) for i in miss_idx]
+
+        new_items = []
+        for i, emb in zip(miss_idx, embeddings):
+            results[i] = emb
+            if emb:
+                new_items.append((keys[i], emb))
+        self._store(new_items)
+        if self._fuzzy:
+            self._store_sim([(keys[i], texts[i]) for i, emb in zip(miss_idx, embeddings) if emb])
+        return results
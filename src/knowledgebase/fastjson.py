@@ -0,0 +1,38 @@
+"""JSON encoding helpers for OpenClaw Knowledgebase.
+
+Uses orjson when it is installed (``pip install openclaw-knowledgebase[fast]``)
+and falls back to the stdlib json module otherwise. Both paths produce
+compact UTF-8 bytes, so the result can be passed straight to requests as
+``data=`` without a second encoding pass.
+
+Usage:
+    from knowledgebase.fastjson import dumps, loads
+    resp = session.post(url, data=dumps(payload))
+    rows = loads(resp.content)
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+# Optional import - orjson is a C extension, several times faster than json
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize obj to compact UTF-8 JSON bytes."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    """Deserialize JSON from bytes or str."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
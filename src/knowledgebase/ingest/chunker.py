@@ -6,6 +6,12 @@ from typing import Iterator
 
 from knowledgebase.config import get_config
 
+# Markdown ATX headers: "## Title" -> ("##", "Title")
+_HEADER_RE = re.compile(r'^(#{1,6})\s+(.+)$', re.MULTILINE)
+
+# Fallback break points when the preferred separator isn't in the window
+_SENTENCE_BREAKS = (". ", ".\n", "! ", "!\n", "? ", "?\n")
+
 
 @dataclass
 class TextChunk:
@@ -17,6 +23,38 @@ class TextChunk:
     metadata: dict | None = None
 
 
+def find_chunk_end(text: str, search_start: int, end: int, separator: str = "\n\n") -> int:
+    """
+    Pick where a chunk ending at `end` should actually stop.
+
+    Looks for the last separator, then sentence break, then word break in
+    text[search_start:end] and returns the offset just past it, or `end`
+    if the window has none.
+    """
+    # A cascade of rfind calls beats one combined regex here: rfind scans
+    # backwards in C and usually hits within a few characters, while a
+    # regex has to walk (or backtrack over) the whole window.
+    # Bounded rfind returns absolute offsets, so the window is never copied.
+    rfind = text.rfind
+
+    # Try to find paragraph break
+    last_sep = rfind(separator, search_start, end)
+    if last_sep != -1:
+        return last_sep + len(separator)
+
+    # Try sentence break
+    for pattern in _SENTENCE_BREAKS:
+        last_sep = rfind(pattern, search_start, end)
+        if last_sep != -1:
+            return last_sep + len(pattern)
+
+    # Try word break
+    last_space = rfind(" ", search_start, end)
+    if last_space != -1:
+        return last_space + 1
+    return end
+
+
 def chunk_text(
     text: str,
     chunk_size: int | None = None,
@@ -45,47 +83,32 @@ def chunk_text(
     # Clean up text
     text = text.strip()
     
+    text_len = len(text)
+
     # If text is shorter than chunk_size, return as single chunk
-    if len(text) <= chunk_size:
+    if text_len <= chunk_size:
         return [TextChunk(
             content=text,
             chunk_number=0,
             start_char=0,
-            end_char=len(text),
+            end_char=text_len,
         )]
     
     chunks = []
     start = 0
     chunk_num = 0
     
-    while start < len(text):
+    while start < text_len:
         # Calculate end position
         end = start + chunk_size
         
         # If we're not at the end, try to find a good break point
-        if end < len(text):
+        if end < text_len:
             # Look for separator in the last part of the chunk
             search_start = max(start, end - chunk_overlap)
-            search_text = text[search_start:end]
-            
-            # Try to find paragraph break
-            last_sep = search_text.rfind(separator)
-            if last_sep != -1:
-                end = search_start + last_sep + len(separator)
-            else:
-                # Try sentence break
-                for pattern in [". ", ".\n", "! ", "!\n", "? ", "?\n"]:
-                    last_sep = search_text.rfind(pattern)
-                    if last_sep != -1:
-                        end = search_start + last_sep + len(pattern)
-                        break
-                else:
-                    # Try word break
-                    last_space = search_text.rfind(" ")
-                    if last_space != -1:
-                        end = search_start + last_space + 1
+            end = find_chunk_end(text, search_start, end, separator)
         else:
-            end = len(text)
+            end = text_len
         
         # Extract chunk
         chunk_text_content = text[start:end].strip()
@@ -100,11 +123,49 @@ def chunk_text(
             chunk_num += 1
         
         # Move start position with overlap
-        start = end - chunk_overlap if end < len(text) else end
+        start = end - chunk_overlap if end < text_len else end
     
     return chunks
 
 
+def _iter_sections(markdown: str) -> Iterator[tuple[tuple, str, int]]:
+    """
+    Yield (headers, content, start) for each non-empty run of text between
+    markdown headers.
+
+    `headers` is a 7-tuple of header text per level 1-6 (index 0 unused,
+    None where unset) in effect for that section.
+    """
+    # Header text per level 1-6 (index 0 unused); markdown has no deeper levels
+    current_headers: list[str | None] = [None] * 7
+    last_end = 0
+    
+    # Split by headers
+    for match in _HEADER_RE.finditer(markdown):
+        # Yield content before this header
+        if last_end < match.start():
+            content = markdown[last_end:match.start()].strip()
+            if content:
+                yield tuple(current_headers), content, last_end
+        
+        # Update headers
+        level = len(match.group(1))
+        header_text = match.group(2)
+        
+        # Clear lower-level headers
+        for lower in range(level + 1, 7):
+            current_headers[lower] = None
+        
+        current_headers[level] = header_text
+        last_end = match.end()
+    
+    # Don't forget content after last header
+    if last_end < len(markdown):
+        content = markdown[last_end:].strip()
+        if content:
+            yield tuple(current_headers), content, last_end
+
+
 def chunk_markdown(
     markdown: str,
     chunk_size: int | None = None,
@@ -130,60 +191,26 @@ def chunk_markdown(
     if not markdown or not markdown.strip():
         return []
     
-    # Split by headers
-    header_pattern = re.compile(r'^(#{1,6})\s+(.+)$', re.MULTILINE)
-    
-    sections = []
-    current_headers = {}  # level -> header text
-    last_end = 0
-    
-    for match in header_pattern.finditer(markdown):
-        # Save content before this header
-        if last_end < match.start():
-            content = markdown[last_end:match.start()].strip()
-            if content:
-                sections.append({
-                    "headers": dict(current_headers),
-                    "content": content,
-                    "start": last_end,
-                })
-        
-        # Update headers
-        level = len(match.group(1))
-        header_text = match.group(2)
-        
-        # Clear lower-level headers
-        for l in list(current_headers.keys()):
-            if l >= level:
-                del current_headers[l]
-        
-        current_headers[level] = header_text
-        last_end = match.end()
-    
-    # Don't forget content after last header
-    if last_end < len(markdown):
-        content = markdown[last_end:].strip()
-        if content:
-            sections.append({
-                "headers": dict(current_headers),
-                "content": content,
-                "start": last_end,
-            })
-    
-    # Now chunk each section
+    # Chunk each section as it is found
     chunks = []
     chunk_num = 0
+    # Sections under the same header path share one prefix; each chunk gets
+    # its own copy of the headers dict
+    path_cache: dict[tuple, tuple[dict, str]] = {}
     
-    for section in sections:
-        # Build header prefix if preserving
-        header_prefix = ""
-        if preserve_headers and section["headers"]:
-            header_lines = []
-            for level in sorted(section["headers"].keys()):
-                header_lines.append(f"{'#' * level} {section['headers'][level]}")
-            header_prefix = "\n".join(header_lines) + "\n\n"
-        
-        content = section["content"]
+    for header_slots, content, section_start in _iter_sections(markdown):
+        cached = path_cache.get(header_slots)
+        if cached is None:
+            headers = {level: text for level, text in enumerate(header_slots) if text}
+            # Build header prefix if preserving
+            header_prefix = ""
+            if preserve_headers and headers:
+                # Keys are already in ascending level order
+                header_prefix = "\n".join(
+                    f"{'#' * level} {text}" for level, text in headers.items()
+                ) + "\n\n"
+            cached = path_cache[header_slots] = (headers, header_prefix)
+        headers, header_prefix = cached
         
         # Adjust chunk size for header prefix
         effective_chunk_size = chunk_size - len(header_prefix)
@@ -191,11 +218,11 @@ def chunk_markdown(
         if len(content) <= effective_chunk_size:
             # Single chunk for this section
             chunks.append(TextChunk(
-                content=header_prefix + content if preserve_headers else content,
+                content=header_prefix + content if header_prefix else content,
                 chunk_number=chunk_num,
-                start_char=section["start"],
-                end_char=section["start"] + len(content),
-                metadata={"headers": section["headers"]} if section["headers"] else None,
+                start_char=section_start,
+                end_char=section_start + len(content),
+                metadata={"headers": dict(headers)} if headers else None,
             ))
             chunk_num += 1
         else:
@@ -208,11 +235,11 @@ def chunk_markdown(
             
             for sc in section_chunks:
                 chunks.append(TextChunk(
-                    content=header_prefix + sc.content if preserve_headers else sc.content,
+                    content=header_prefix + sc.content if header_prefix else sc.content,
                     chunk_number=chunk_num,
-                    start_char=section["start"] + sc.start_char,
-                    end_char=section["start"] + sc.end_char,
-                    metadata={"headers": section["headers"]} if section["headers"] else None,
+                    start_char=section_start + sc.start_char,
+                    end_char=section_start + sc.end_char,
+                    metadata={"headers": dict(headers)} if headers else None,
                 ))
                 chunk_num += 1
     
@@ -2,14 +2,22 @@
 
 import hashlib
 import re
+import threading
 import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from typing import Callable, Iterator
 from urllib.parse import urljoin, urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from knowledgebase.config import get_config
+from knowledgebase.log import get_logger
+
+logger = get_logger(__name__)
 
 # Optional imports
 try:
@@ -24,6 +32,51 @@ try:
 except ImportError:
     HAS_HTML2TEXT = False
 
+# xxh3 hashes page content at memory speed; blake2b is the stdlib fallback
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
+# lxml is a C parser, several times faster than bs4's pure-Python html.parser
+try:
+    import lxml.html
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+_HTML_PARSER = "lxml" if HAS_LXML else "html.parser"
+# html.parser also finds <loc> tags, so sitemaps work without lxml
+_XML_PARSER = "lxml-xml" if HAS_LXML else "html.parser"
+
+
+DEFAULT_USER_AGENT = "OpenClaw-Knowledgebase/1.0"
+
+# HTML bodies are read up to this size; anything beyond is dropped
+MAX_PAGE_BYTES = 5 * 1024 * 1024
+
+# Shared keep-alive session: pages on the same host reuse one TCP/TLS connection
+_session: requests.Session | None = None
+
+
+def get_session() -> requests.Session:
+    """Get the crawler's pooled HTTP session (created on first use)."""
+    global _session
+    if _session is None:
+        session = requests.Session()
+        session.headers["User-Agent"] = DEFAULT_USER_AGENT
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504)),
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _session = session
+    return _session
+
 
 @dataclass
 class CrawledPage:
@@ -38,7 +91,34 @@ class CrawledPage:
     
     def __post_init__(self):
         if not self.content_hash and self.content:
-            self.content_hash = hashlib.md5(self.content.encode()).hexdigest()
+            self.content_hash = _hash128(self.content.encode("utf-8", "replace")).hex()
+
+
+def _hash128(data: bytes) -> bytes:
+    """Fast 128-bit non-cryptographic digest of data."""
+    if HAS_XXHASH:
+        return xxhash.xxh3_128_digest(data)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+# Tag-stripping fallback for html_to_markdown when html2text is missing
+_SCRIPT_RE = re.compile(r'<script[^>]*>.*?</script>', re.DOTALL | re.IGNORECASE)
+_STYLE_RE = re.compile(r'<style[^>]*>.*?</style>', re.DOTALL | re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+_WS_RE = re.compile(r"\s+")
+
+
+def content_fingerprint(content: str) -> bytes:
+    """
+    Fingerprint page content for duplicate detection within a crawl.
+    
+    Only whitespace runs and case are normalized, so mirrors of the same
+    page collide while pages that differ in any number (versioned docs,
+    changelogs, numbered API pages) stay distinct.
+    """
+    normalized = _WS_RE.sub(" ", content).strip().lower()
+    return _hash128(normalized.encode("utf-8"))
 
 
 def check_crawler_deps() -> tuple[bool, str]:
@@ -58,9 +138,17 @@ def html_to_markdown(html: str) -> str:
     """Convert HTML to Markdown."""
     if not HAS_HTML2TEXT:
         # Fallback: strip tags
-        text = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.DOTALL | re.IGNORECASE)
-        text = re.sub(r'<style[^>]*>.*?</style>', '', text, flags=re.DOTALL | re.IGNORECASE)
-        text = re.sub(r'<[^>]+>', '', text)
+        if HAS_LXML and html.strip():
+            # One C-level parse instead of three regex passes
+            try:
+                doc = lxml.html.fromstring(html)
+                etree.strip_elements(doc, "script", "style", with_tail=False)
+                return doc.text_content().strip()
+            except (etree.ParserError, ValueError):
+                pass
+        text = _SCRIPT_RE.sub('', html)
+        text = _STYLE_RE.sub('', text)
+        text = _TAG_RE.sub('', text)
         return text.strip()
     
     h = html2text.HTML2Text()
@@ -76,11 +164,10 @@ def html_to_markdown(html: str) -> str:
     return h.handle(html).strip()
 
 
-def extract_links(soup: "BeautifulSoup", base_url: str) -> list[str]:
-    """Extract all links from a page."""
+def _absolute_links(hrefs: Iterator[str], base_url: str) -> list[str]:
+    """Resolve hrefs against base_url, keeping unique http(s) links."""
     links = []
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
+    for href in hrefs:
         # Skip anchors, javascript, mailto
         if href.startswith(("#", "javascript:", "mailto:", "tel:")):
             continue
@@ -91,7 +178,13 @@ def extract_links(soup: "BeautifulSoup", base_url: str) -> list[str]:
             # Remove fragment
             absolute = absolute.split("#")[0]
             links.append(absolute)
-    return list(set(links))
+    # Dedupe keeping page order, so the crawl frontier follows document order
+    return list(dict.fromkeys(links))
+
+
+def extract_links(soup: "BeautifulSoup", base_url: str) -> list[str]:
+    """Extract all links from a page."""
+    return _absolute_links((a["href"] for a in soup.find_all("a", href=True)), base_url)
 
 
 def extract_title(soup: "BeautifulSoup") -> str | None:
@@ -123,10 +216,53 @@ def extract_main_content(soup: "BeautifulSoup") -> str:
     return str(body) if body else str(soup)
 
 
+_REMOVED_TAGS = ("script", "style", "nav", "header", "footer", "aside", "noscript")
+_MAIN_CLASS_RE = re.compile(r"content|main|article", re.I)
+
+
+def _extract_page_lxml(html: str, base_url: str) -> tuple[str | None, str, list[str]]:
+    """
+    lxml version of extract_title + extract_main_content + extract_links.
+    
+    Parses once and does the work with C-level tree operations instead of
+    three BeautifulSoup walks. Returns (title, main content HTML, links).
+    """
+    doc = lxml.html.fromstring(html)
+    
+    # Title first: an <h1> inside <header> still counts
+    title = None
+    title_el = doc.find(".//title")
+    if title_el is not None and title_el.text and title_el.text.strip():
+        title = title_el.text.strip()
+    else:
+        h1 = doc.find(".//h1")
+        if h1 is not None:
+            title = h1.text_content().strip()
+    
+    # Remove unwanted elements; links inside them are dropped too
+    etree.strip_elements(doc, *_REMOVED_TAGS, with_tail=False)
+    
+    main = doc.find(".//main")
+    if main is None:
+        main = doc.find(".//article")
+    if main is None:
+        main = next(
+            (el for el in doc.iter() if _MAIN_CLASS_RE.search(el.get("class") or "")), None
+        )
+    if main is None:
+        main = doc if doc.tag == "body" else doc.find(".//body")
+    if main is None:
+        main = doc
+    main_html = lxml.html.tostring(main, encoding="unicode", with_tail=False)
+    
+    hrefs = (a.get("href") for a in doc.iter("a") if a.get("href"))
+    return title, main_html, _absolute_links(hrefs, base_url)
+
+
 def crawl_url(
     url: str,
     timeout: int = 30,
-    user_agent: str = "OpenClaw-Knowledgebase/1.0",
+    user_agent: str = DEFAULT_USER_AGENT,
 ) -> CrawledPage | None:
     """
     Crawl a single URL.
@@ -144,22 +280,38 @@ def crawl_url(
         raise ImportError(msg)
     
     try:
-        headers = {"User-Agent": user_agent}
-        response = requests.get(url, headers=headers, timeout=timeout)
-        response.raise_for_status()
-        
-        # Check content type
-        content_type = response.headers.get("content-type", "")
-        if "text/html" not in content_type.lower():
-            return None
-        
-        html = response.text
-        soup = BeautifulSoup(html, "html.parser")
+        headers = {"User-Agent": user_agent} if user_agent != DEFAULT_USER_AGENT else None
+        # Stream so non-HTML links (PDFs, images, archives) are never downloaded
+        with get_session().get(url, headers=headers, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            
+            # Check content type
+            content_type = response.headers.get("content-type", "")
+            if "text/html" not in content_type.lower():
+                return None
+            
+            body = bytearray()
+            for block in response.iter_content(chunk_size=64 * 1024):
+                body += block
+                if len(body) >= MAX_PAGE_BYTES:
+                    del body[MAX_PAGE_BYTES:]
+                    break
+            html = body.decode(response.encoding or "utf-8", errors="replace")
         
-        title = extract_title(soup)
-        main_html = extract_main_content(soup)
+        extracted = None
+        if HAS_LXML:
+            try:
+                extracted = _extract_page_lxml(html, url)
+            except (etree.ParserError, ValueError):
+                pass  # e.g. empty or XML-declared document; let bs4 try
+        if extracted:
+            title, main_html, links = extracted
+        else:
+            soup = BeautifulSoup(html, _HTML_PARSER)
+            title = extract_title(soup)
+            main_html = extract_main_content(soup)
+            links = extract_links(soup, url)
         content = html_to_markdown(main_html)
-        links = extract_links(soup, url)
         
         return CrawledPage(
             url=url,
@@ -173,10 +325,39 @@ def crawl_url(
             },
         )
         
-    except Exception as e:
+    except requests.exceptions.RequestException as e:
+        logger.warning("Fetch failed for %s: %s", url, e)
+        return None
+    except (LookupError, ValueError) as e:
+        # Unknown charset or markup the parsers reject
+        logger.warning("Could not parse %s: %s", url, e)
         return None
 
 
+class _DomainThrottle:
+    """Space out request starts to the same host by at least `interval` seconds.
+
+    Thread-safe: each caller reserves the next free slot for its host under
+    the lock, then sleeps outside it, so hosts don't wait on each other.
+    """
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next: dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def wait(self, url: str) -> None:
+        if self.interval <= 0:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
 def crawl_website(
     start_url: str,
     max_depth: int = 2,
@@ -184,64 +365,155 @@ def crawl_website(
     same_domain_only: bool = True,
     rate_limit: float = 1.0,
     progress_callback: Callable[[int, int, str], None] | None = None,
+    concurrency: int = 4,
+    skip_duplicates: bool = True,
 ) -> Iterator[CrawledPage]:
     """
     Crawl a website starting from a URL.
     
+    Up to `concurrency` pages are fetched in parallel; `rate_limit` still
+    applies per host, so one site never sees more than one request start
+    per `rate_limit` seconds.
+    
     Args:
         start_url: Starting URL
         max_depth: Maximum link depth to follow (0 = only start_url)
         max_pages: Maximum pages to crawl
         same_domain_only: Only follow links on same domain
-        rate_limit: Seconds between requests
+        rate_limit: Seconds between requests to the same host
         progress_callback: Called with (crawled, total, current_url)
+        concurrency: Maximum requests in flight
+        skip_duplicates: Don't yield pages whose content (ignoring case and
+            whitespace) matches a page already yielded; their links are
+            still followed. Each skipped URL is logged at INFO.
         
     Yields:
-        CrawledPage objects
+        CrawledPage objects, in completion order
     """
     ok, msg = check_crawler_deps()
     if not ok:
         raise ImportError(msg)
     
     start_domain = urlparse(start_url).netloc
+    # Most same-site links start with one of these; only the rest need urlparse
+    domain_prefixes = (f"https://{start_domain}", f"http://{start_domain}")
+    
+    def on_start_domain(link: str) -> bool:
+        for prefix in domain_prefixes:
+            if link.startswith(prefix):
+                # Guard against e.g. example.com.evil.org or example.com:8080
+                if link[len(prefix):len(prefix) + 1] in ("", "/", "?", "#"):
+                    return True
+                break
+        return urlparse(link).netloc == start_domain
+    
+    throttle = _DomainThrottle(rate_limit)
+    
+    def fetch(url: str) -> CrawledPage | None:
+        throttle.wait(url)
+        return crawl_url(url)
     
     # Queue: (url, depth)
-    queue = [(start_url, 0)]
+    queue = deque([(start_url, 0)])
     visited = set()
+    seen_content: set[bytes] = set()
+    in_flight: dict[Future, int] = {}  # future -> depth
     crawled = 0
     
-    while queue and crawled < max_pages:
-        url, depth = queue.pop(0)
-        
-        # Skip if already visited
-        if url in visited:
-            continue
-        visited.add(url)
-        
-        # Progress callback
-        if progress_callback:
-            progress_callback(crawled, len(queue) + crawled, url)
-        
-        # Crawl
-        page = crawl_url(url)
-        if page:
-            yield page
-            crawled += 1
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="kb-crawl")
+    try:
+        while (queue or in_flight) and crawled < max_pages:
+            # Keep the pool busy, but never fetch more than can still be yielded
+            while queue and len(in_flight) < min(concurrency, max_pages - crawled):
+                url, depth = queue.popleft()
+                
+                # Skip if already visited
+                if url in visited:
+                    continue
+                visited.add(url)
+                
+                # Progress callback
+                if progress_callback:
+                    progress_callback(crawled, len(queue) + len(in_flight) + crawled, url)
+                
+                in_flight[executor.submit(fetch, url)] = depth
             
-            # Add links to queue if not at max depth
-            if depth < max_depth:
-                for link in page.links:
-                    if link not in visited:
-                        # Check domain
-                        if same_domain_only:
-                            link_domain = urlparse(link).netloc
-                            if link_domain != start_domain:
+            if not in_flight:
+                continue
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                depth = in_flight.pop(future)
+                page = future.result()
+                if not page or crawled >= max_pages:
+                    continue
+                fingerprint = content_fingerprint(page.content) if skip_duplicates else None
+                if fingerprint not in seen_content:
+                    if fingerprint:
+                        seen_content.add(fingerprint)
+                    yield page
+                    crawled += 1
+                else:
+                    logger.info("Skipping duplicate page %s", page.url)
+                
+                # Add links to queue if not at max depth
+                if depth < max_depth:
+                    for link in page.links:
+                        if link not in visited:
+                            # Check domain
+                            if same_domain_only and not on_start_domain(link):
                                 continue
-                        queue.append((link, depth + 1))
-            
-            # Rate limiting
-            if rate_limit > 0 and queue:
-                time.sleep(rate_limit)
+                            queue.append((link, depth + 1))
+    finally:
+        # Also runs when the caller stops iterating early
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _sitemap_urls(sitemap_url: str, limit: int, _depth: int = 0) -> list[str]:
+    """
+    Page URLs listed in a sitemap (up to `limit`), following sitemap indexes.
+    
+    With lxml the XML is streamed through iterparse and processed entries
+    are freed as it goes, so large sitemaps are never held in memory whole.
+    """
+    urls: list[str] = []
+    nested: list[str] = []  # child sitemaps listed by a <sitemapindex>
+    
+    with get_session().get(sitemap_url, timeout=30, stream=True) as response:
+        response.raise_for_status()
+        if HAS_LXML:
+            response.raw.decode_content = True  # undo gzip/deflate transfer encoding
+            for _, loc in etree.iterparse(response.raw, tag="{*}loc"):
+                entry = loc.getparent()
+                target = urls
+                if entry is not None and etree.QName(entry).localname == "sitemap":
+                    target = nested
+                if loc.text and loc.text.strip():
+                    target.append(loc.text.strip())
+                # Drop entries already read
+                loc.clear()
+                if entry is not None:
+                    while entry.getprevious() is not None:
+                        del entry.getparent()[0]
+                if len(urls) >= limit:
+                    break
+        else:
+            soup = BeautifulSoup(response.text, _XML_PARSER)
+            locs = [loc.text.strip() for loc in soup.find_all("loc") if loc.text.strip()]
+            if soup.find("sitemapindex"):
+                nested = locs
+            else:
+                urls = locs
+    
+    # Index files point at other sitemaps; follow them (but not endlessly)
+    for child in nested:
+        if len(urls) >= limit or _depth >= 2:
+            break
+        try:
+            urls.extend(_sitemap_urls(child, limit - len(urls), _depth + 1))
+        except (requests.exceptions.RequestException, SyntaxError, ValueError) as e:
+            # lxml's XMLSyntaxError is a SyntaxError
+            logger.warning("Skipping sitemap %s: %s", child, e)
+    return urls[:limit]
 
 
 def crawl_sitemap(
@@ -249,6 +521,7 @@ def crawl_sitemap(
     max_pages: int = 100,
     rate_limit: float = 1.0,
     progress_callback: Callable[[int, int, str], None] | None = None,
+    skip_duplicates: bool = True,
 ) -> Iterator[CrawledPage]:
     """
     Crawl URLs from a sitemap.xml.
@@ -258,6 +531,9 @@ def crawl_sitemap(
         max_pages: Maximum pages to crawl
         rate_limit: Seconds between requests
         progress_callback: Called with (crawled, total, current_url)
+        skip_duplicates: Don't yield pages whose content (ignoring case and
+            whitespace) matches a page already yielded; each skipped URL is
+            logged at INFO
         
     Yields:
         CrawledPage objects
@@ -267,24 +543,31 @@ def crawl_sitemap(
         raise ImportError(msg)
     
     try:
-        response = requests.get(sitemap_url, timeout=30)
-        response.raise_for_status()
+        urls = _sitemap_urls(sitemap_url, max_pages)
         
-        soup = BeautifulSoup(response.text, "xml")
-        urls = [loc.text for loc in soup.find_all("loc")]
+        total = len(urls)
+        seen_content: set[bytes] = set()
+        # Deadline per host: fetch time (and the caller's work between
+        # yields) counts toward the delay instead of adding to it
+        throttle = _DomainThrottle(rate_limit)
         
-        total = min(len(urls), max_pages)
-        
-        for i, url in enumerate(urls[:max_pages]):
+        for i, url in enumerate(urls):
             if progress_callback:
                 progress_callback(i, total, url)
             
+            throttle.wait(url)
             page = crawl_url(url)
             if page:
-                yield page
-            
-            if rate_limit > 0 and i < total - 1:
-                time.sleep(rate_limit)
+                if skip_duplicates:
+                    fingerprint = content_fingerprint(page.content)
+                    if fingerprint in seen_content:
+                        logger.info("Skipping duplicate page %s", page.url)
+                        page = None
+                    else:
+                        seen_content.add(fingerprint)
+                if page:
+                    yield page
                 
-    except Exception as e:
+    except (requests.exceptions.RequestException, SyntaxError, ValueError) as e:
+        logger.warning("Sitemap %s failed: %s", sitemap_url, e)
         return
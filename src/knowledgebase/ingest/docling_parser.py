@@ -3,11 +3,19 @@
 import csv
 import io
 import json
+import mmap
+import multiprocessing
 import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Iterator
 
+from knowledgebase.log import get_logger
+
+logger = get_logger(__name__)
+
 # Optional import - Docling is heavy (ML models)
 try:
     from docling.document_converter import DocumentConverter
@@ -35,6 +43,25 @@ DOCLING_FORMATS = {".pdf", ".docx", ".doc", ".pptx", ".ppt", ".xlsx", ".xls", ".
 # All supported formats
 ALL_FORMATS = NATIVE_TEXT_FORMATS | DOCLING_FORMATS
 
+# Directories parse_directory never descends into
+SKIP_DIRS = {".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", ".tox"}
+
+
+# Docling loads its layout/OCR/table models in the constructor, so build it
+# once per process instead of once per file
+_converter: "DocumentConverter | None" = None
+_converter_lock = threading.Lock()
+
+
+def _get_converter() -> "DocumentConverter":
+    """Get the shared DocumentConverter (created on first use)."""
+    global _converter
+    if _converter is None:
+        with _converter_lock:
+            if _converter is None:
+                _converter = DocumentConverter()
+    return _converter
+
 
 def check_docling() -> tuple[bool, str]:
     """Check if Docling is available."""
@@ -51,15 +78,36 @@ def get_supported_formats(include_docling: bool = True) -> set[str]:
     return formats
 
 
+# Below this size a plain read is cheaper than setting up a mapping
+_MMAP_MIN_BYTES = 64 * 1024
+
+
+def _read_text(path: Path, size: int) -> str:
+    """Read a UTF-8 text file like Path.read_text(errors="ignore").
+    
+    Large files are decoded straight from a memory map, skipping the
+    intermediate bytes copy of the whole file.
+    """
+    if size < _MMAP_MIN_BYTES:
+        return path.read_text(encoding="utf-8", errors="ignore")
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        content = str(mm, "utf-8", "ignore")
+    # Match text-mode universal newlines
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+
 def parse_plain_text(path: Path) -> ParsedDocument:
     """Parse a plain text file."""
-    content = path.read_text(encoding="utf-8", errors="ignore")
+    size = path.stat().st_size
+    content = _read_text(path, size)
     
     # Try to extract title from first line (for markdown)
     title = None
-    lines = content.split("\n")
-    if lines and lines[0].startswith("# "):
-        title = lines[0][2:].strip()
+    first_line = content.partition("\n")[0]
+    if first_line.startswith("# "):
+        title = first_line[2:].strip()
     
     return ParsedDocument(
         path=str(path),
@@ -67,7 +115,7 @@ def parse_plain_text(path: Path) -> ParsedDocument:
         content=content,
         format=path.suffix.lower().lstrip("."),
         metadata={
-            "size_bytes": path.stat().st_size,
+            "size_bytes": size,
             "filename": path.name,
         },
     )
@@ -119,7 +167,7 @@ def parse_csv(path: Path, delimiter: str = ",") -> ParsedDocument:
                 "headers": header,
             },
         )
-    except Exception as e:
+    except csv.Error as e:
         # Fallback to plain text
         return ParsedDocument(
             path=str(path),
@@ -173,8 +221,7 @@ def parse_with_docling(path: Path) -> ParsedDocument | None:
         return None
     
     try:
-        converter = DocumentConverter()
-        result = converter.convert(str(path))
+        result = _get_converter().convert(str(path))
         
         # Export to markdown
         content = result.document.export_to_markdown()
@@ -199,7 +246,9 @@ def parse_with_docling(path: Path) -> ParsedDocument | None:
         )
         
     except Exception as e:
+        # Docling and its backends raise many unrelated exception types.
         # Return error document instead of None for debugging
+        logger.warning("Docling could not parse %s: %s", path, e)
         return ParsedDocument(
             path=str(path),
             title=path.stem,
@@ -238,27 +287,35 @@ def parse_document(path: str | Path) -> ParsedDocument | None:
     if suffix == ".csv":
         try:
             return parse_csv(path, delimiter=",")
-        except Exception:
+        except (OSError, ValueError) as e:
+            # ValueError includes UnicodeDecodeError
+            logger.warning("Could not read %s: %s", path, e)
             return None
     
     if suffix == ".tsv":
         try:
             return parse_csv(path, delimiter="\t")
-        except Exception:
+        except (OSError, ValueError) as e:
+            # ValueError includes UnicodeDecodeError
+            logger.warning("Could not read %s: %s", path, e)
             return None
     
     # JSON
     if suffix == ".json":
         try:
             return parse_json(path)
-        except Exception:
+        except (OSError, ValueError) as e:
+            # ValueError includes UnicodeDecodeError
+            logger.warning("Could not read %s: %s", path, e)
             return None
     
     # Plain text formats
     if suffix in NATIVE_TEXT_FORMATS:
         try:
             return parse_plain_text(path)
-        except Exception:
+        except (OSError, ValueError) as e:
+            # ValueError includes UnicodeDecodeError
+            logger.warning("Could not read %s: %s", path, e)
             return None
     
     # Docling formats
@@ -268,30 +325,69 @@ def parse_document(path: str | Path) -> ParsedDocument | None:
             if suffix in {".html", ".htm"}:
                 try:
                     return parse_plain_text(path)
-                except:
-                    pass
+                except (OSError, ValueError) as e:
+                    logger.warning("Could not read %s: %s", path, e)
             return None
         return parse_with_docling(path)
     
     # Unknown format - try plain text
     try:
         return parse_plain_text(path)
-    except:
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read %s: %s", path, e)
         return None
 
 
+def _walk(root: str, recursive: bool, extensions: set[str]) -> Iterator[tuple[Path, str]]:
+    """
+    Yield (path, extension) for files under root with a wanted extension.
+    
+    Extensions are checked on the raw name before any Path is built, and
+    SKIP_DIRS subtrees are pruned without being listed. Directory symlinks
+    are not followed, so link cycles can't loop the walk.
+    """
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return
+    for entry in entries:
+        name = entry.name
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if recursive and name not in SKIP_DIRS:
+                    yield from _walk(entry.path, recursive, extensions)
+            elif entry.is_file():
+                dot = name.rfind(".")
+                if dot > 0:
+                    ext = name[dot + 1:].lower()
+                    if ext in extensions:
+                        yield Path(entry.path), ext
+        except OSError:
+            continue
+
+
 def parse_directory(
     directory: str | Path,
     recursive: bool = True,
     extensions: set[str] | None = None,
+    workers: int = 1,
 ) -> Iterator[ParsedDocument]:
     """
     Parse all documents in a directory.
     
+    Text formats are parsed in-process as they are found. With workers > 1,
+    Docling formats are parsed in up to `workers` separate processes, since
+    Docling's layout models are CPU-bound and hold the GIL; those documents
+    are yielded as they finish. Each worker loads its own full model set,
+    so memory use grows with `workers`. A file whose worker fails (e.g. the
+    process is killed for running out of memory) is logged and skipped.
+    
     Args:
         directory: Directory path
         recursive: Search subdirectories
         extensions: File extensions to include (default: all supported)
+        workers: Docling worker processes (default 1 = in-process, no pool)
         
     Yields:
         ParsedDocument objects
@@ -306,39 +402,69 @@ def parse_directory(
     # Normalize extensions
     extensions = {ext.lower().lstrip(".") for ext in extensions}
     
-    pattern = "**/*" if recursive else "*"
+    pool: ProcessPoolExecutor | None = None
+    pending: dict[Future, Path] = {}
     
-    for path in directory.glob(pattern):
-        if path.is_file():
-            suffix = path.suffix.lower().lstrip(".")
-            if suffix in extensions:
-                doc = parse_document(path)
-                if doc:
-                    yield doc
+    try:
+        for path, suffix in _walk(str(directory), recursive, extensions):
+            if workers > 1 and HAS_DOCLING and f".{suffix}" in DOCLING_FORMATS:
+                if pool is None:
+                    # spawn: forking a process that may hold torch threads is unsafe
+                    pool = ProcessPoolExecutor(
+                        max_workers=workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_get_converter,  # load models once per worker
+                    )
+                pending[pool.submit(parse_document, str(path))] = path
+                continue
+            doc = parse_document(path)
+            if doc:
+                yield doc
+        
+        for future in as_completed(pending):
+            try:
+                doc = future.result()
+            except Exception as e:
+                # BrokenProcessPool, pickling errors, ...: skip the file
+                # like any other unparseable document
+                logger.warning("Worker failed on %s: %s", pending[future], e)
+                continue
+            if doc:
+                yield doc
+    finally:
+        if pool is not None:
+            # Also runs when the caller stops iterating early
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Parse time estimates: (seconds per MB, fixed overhead in seconds)
+_NATIVE_TEXT_COST = (0.1, 0.0)  # Very fast
+_DEFAULT_COST = (0.5, 0.0)
+_PARSE_COSTS: dict[str, tuple[float, float]] = {
+    ".pdf": (3.0, 2.0),  # PDFs are slow, plus model loading
+    ".docx": (1.5, 1.0),
+    ".doc": (1.5, 1.0),
+    ".pptx": (2.0, 1.0),
+    ".ppt": (2.0, 1.0),
+    ".xlsx": (1.5, 1.0),
+    ".xls": (1.5, 1.0),
+}
 
 
 def estimate_parse_time(path: str | Path) -> float:
     """Estimate parsing time in seconds based on file size and type."""
     path = Path(path)
-    if not path.exists():
+    try:
+        size_mb = path.stat().st_size / (1024 * 1024)
+    except OSError:
         return 0
     
-    size_mb = path.stat().st_size / (1024 * 1024)
     suffix = path.suffix.lower()
-    
-    # Base estimates (seconds per MB)
     if suffix in NATIVE_TEXT_FORMATS:
-        return size_mb * 0.1  # Very fast
-    elif suffix == ".pdf":
-        return size_mb * 3.0 + 2.0  # PDFs are slow, plus model loading
-    elif suffix in {".docx", ".doc"}:
-        return size_mb * 1.5 + 1.0
-    elif suffix in {".pptx", ".ppt"}:
-        return size_mb * 2.0 + 1.0
-    elif suffix in {".xlsx", ".xls"}:
-        return size_mb * 1.5 + 1.0
+        per_mb, overhead = _NATIVE_TEXT_COST
     else:
-        return size_mb * 0.5
+        per_mb, overhead = _PARSE_COSTS.get(suffix, _DEFAULT_COST)
+    return size_mb * per_mb + overhead
 
 
 # Format descriptions for UI
@@ -6,20 +6,44 @@ All modules should use:
 
 Configuration via environment:
     LOG_LEVEL=DEBUG|INFO|WARNING|ERROR  (default: INFO)
-    LOG_FORMAT=rich|json|plain          (default: rich)
+    LOG_FORMAT=rich|json|plain          (default: rich on a terminal, plain otherwise)
 
 Rich handler gives colored, readable output for CLI/dev.
 JSON format is available for production log aggregation.
 Plain falls back to stdlib formatting.
+
+Pass arguments to the logger instead of pre-formatting messages, and guard
+expensive debug output with logger.isEnabledFor(logging.DEBUG):
+    logger.debug("Fetched %s (%d bytes)", url, size)
 """
 
 from __future__ import annotations
 
+import atexit
+import copy
 import logging
 import os
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 
 _configured = False
+_listener: QueueListener | None = None
+
+
+class _LocalQueueHandler(QueueHandler):
+    """QueueHandler for an in-process queue.
+
+    The stock prepare() pre-formats the message and drops exc_info so the
+    record can be pickled; here the record never leaves the process, so only
+    the arguments are merged and Rich can still render tracebacks.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
 
 
 def setup_logging(
@@ -29,16 +53,27 @@ def setup_logging(
     """Configure the root logger for the knowledgebase package.
 
     Safe to call multiple times — only configures once unless forced.
+    Records are handed to a background thread through a queue, so logging
+    calls never block on terminal or pipe writes.
     """
-    global _configured
+    global _configured, _listener
     if _configured:
         return
     _configured = True
 
     level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
-    fmt = (fmt or os.getenv("LOG_FORMAT", "rich")).lower()
+    # Rich rendering is slow and pointless when stderr is piped to a file
+    default_fmt = "rich" if sys.stderr.isatty() else "plain"
+    fmt = (fmt or os.getenv("LOG_FORMAT", default_fmt)).lower()
 
     numeric_level = getattr(logging, level, logging.INFO)
+    if numeric_level > logging.DEBUG:
+        # None of our formats show source location, thread or process, so
+        # skip the per-record frame walk and lookups outside of debugging
+        logging._srcfile = None
+        logging.logThreads = False
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
 
     # Get the knowledgebase root logger
     root = logging.getLogger("knowledgebase")
@@ -67,7 +102,12 @@ def setup_logging(
     else:
         handler = _plain_handler(numeric_level)
 
-    root.addHandler(handler)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root.addHandler(_LocalQueueHandler(log_queue))
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    # Flush queued records before the interpreter exits
+    atexit.register(_listener.stop)
 
     # Silence noisy third-party loggers
     for noisy in ("urllib3", "requests", "httpcore", "httpx"):
@@ -85,20 +125,23 @@ def _plain_handler(level: int) -> logging.Handler:
 
 
 def _json_handler(level: int) -> logging.Handler:
-    """Simple JSON-lines handler for log aggregation."""
-    import json
-    from datetime import datetime, timezone
+    """Simple JSON-lines handler for log aggregation.
+
+    "ts" is the record's epoch timestamp in seconds (float).
+    """
+    from knowledgebase.fastjson import dumps
 
     class JsonFormatter(logging.Formatter):
         def format(self, record: logging.LogRecord) -> str:
-            return json.dumps({
-                "ts": datetime.now(timezone.utc).isoformat(),
+            payload = {
+                "ts": record.created,
                 "level": record.levelname,
                 "logger": record.name,
                 "msg": record.getMessage(),
-                **({"exc": self.formatException(record.exc_info)}
-                   if record.exc_info else {}),
-            })
+            }
+            if record.exc_info:
+                payload["exc"] = self.formatException(record.exc_info)
+            return dumps(payload).decode("utf-8")
 
     handler = logging.StreamHandler(sys.stderr)
     handler.setLevel(level)
@@ -17,15 +17,30 @@ Usage:
 
 from __future__ import annotations
 
+import atexit
+import hashlib
+import os
+import queue
+import tempfile
+import threading
+import time
+from dataclasses import replace
 from datetime import datetime
+from pathlib import Path
+from typing import Callable
 from uuid import UUID
+from weakref import WeakSet
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from knowledgebase.client import Chunk, KnowledgeBase
 from knowledgebase.config import Config, get_config
-from knowledgebase.embeddings import get_embedding
+from knowledgebase.embeddings import get_embedding, get_embeddings_batch
+from knowledgebase.fastjson import dumps, loads
 from knowledgebase.log import get_logger
+from knowledgebase.memory.local_index import LocalIndex, rerank
 from knowledgebase.memory.models import (
     Agent,
     MemoryEntry,
@@ -37,6 +52,171 @@ from knowledgebase.memory.models import (
 
 logger = get_logger(__name__)
 
+_STOP = object()
+
+AUTH_CACHE_PATH = Path.home() / ".cache" / "openclaw-kb" / "agents.json"
+
+
+def _auth_cache_key(supabase_url: str, api_key: str) -> str:
+    """Cache key for an API key; the key itself is never written to disk."""
+    return hashlib.sha256(f"{supabase_url}\0{api_key}".encode("utf-8")).hexdigest()
+
+
+def _load_auth_cache(path: Path = AUTH_CACHE_PATH) -> dict:
+    try:
+        cache = loads(path.read_bytes())
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_auth_cache(cache: dict, path: Path = AUTH_CACHE_PATH) -> None:
+    """Write the cache atomically so concurrent processes never read half a file."""
+    tmp = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # mkstemp creates the file readable by the owner only
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".agents-", suffix=".json")
+        with os.fdopen(fd, "wb") as f:
+            f.write(dumps(cache))
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.debug("Could not write auth cache %s: %s", path, e)
+        if tmp is not None:
+            Path(tmp).unlink(missing_ok=True)
+
+
+def _drop_auth_cache_entry(cache_key: str, path: Path = AUTH_CACHE_PATH) -> None:
+    """Forget one cached authentication (e.g. after Supabase rejected a call)."""
+    cache = _load_auth_cache(path)
+    if cache.pop(cache_key, None) is not None:
+        _save_auth_cache(cache, path)
+
+
+def _vector_literal(embedding) -> str | None:
+    """Format an embedding as a pgvector text literal ("[0.1,0.2,...]").
+
+    pgvector stores float4, and 9 significant digits round-trip any float4
+    exactly, so this drops the float64 digits json.dumps would send
+    (~40% smaller body for a 768/1536-d vector). PostgREST casts the string
+    for vector columns and parameters.
+    """
+    if embedding is None:
+        return None
+    return "[" + ",".join(map("%.9g".__mod__, embedding)) + "]"
+
+
+# Keys accepted in remember_many() items
+_REMEMBER_FIELDS = frozenset({
+    "content", "memory_type", "scope", "tags", "namespace", "importance",
+    "summary", "metadata", "source_id", "chunk_id", "expires_at",
+})
+
+
+class _AccessLogger:
+    """Writes memory access logs from a background thread.
+
+    recall() only enqueues (memory_id, agent_id) pairs. A daemon thread
+    collects up to MAX_BATCH of them (or whatever arrives within MAX_WAIT
+    seconds) and records them with one mb_log_access_batch RPC, falling back
+    to per-entry mb_log_access on databases without the batch function.
+    Loggers with a running worker are flushed at interpreter exit, so
+    short-lived processes that never call close() still record accesses.
+    """
+
+    MAX_BATCH = 64
+    MAX_WAIT = 0.1
+
+    def __init__(self, rpc: Callable[[str, dict], requests.Response]):
+        self._rpc = rpc
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._batch_supported = True
+
+    def log(self, memory_id: UUID, agent_id: UUID) -> None:
+        """Queue one access; never blocks on the network."""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="kb-access-log", daemon=True
+                    )
+                    self._thread.start()
+                    _running_access_loggers.add(self)
+        self._queue.put((str(memory_id), str(agent_id)))
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write out queued accesses and stop the worker thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            _running_access_loggers.discard(self)
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        get = self._queue.get
+        while True:
+            item = get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.MAX_WAIT
+            while len(batch) < self.MAX_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch: list[tuple[str, str]]) -> None:
+        by_agent: dict[str, list[str]] = {}
+        for memory_id, agent_id in batch:
+            by_agent.setdefault(agent_id, []).append(memory_id)
+        try:
+            for agent_id, memory_ids in by_agent.items():
+                if self._batch_supported:
+                    resp = self._rpc(
+                        "mb_log_access_batch",
+                        {"p_memory_ids": memory_ids, "p_agent_id": agent_id},
+                    )
+                    if resp.status_code != 404:
+                        continue
+                    # PostgREST answers 404 for unknown functions (older schema)
+                    logger.info("mb_log_access_batch not found; logging accesses one by one")
+                    self._batch_supported = False
+                for memory_id in memory_ids:
+                    self._rpc(
+                        "mb_log_access",
+                        {"p_memory_id": memory_id, "p_agent_id": agent_id},
+                    )
+        except Exception as e:
+            # Non-critical, and an escaping error would kill the worker and
+            # leave later log() calls queueing forever
+            logger.debug("Access logging failed: %s", e)
+
+
+# Loggers whose worker thread may still hold queued accesses
+_running_access_loggers: WeakSet[_AccessLogger] = WeakSet()
+
+
+@atexit.register
+def _flush_access_loggers() -> None:
+    """Write out pending accesses before daemon worker threads are killed."""
+    for access_logger in list(_running_access_loggers):
+        access_logger.close()
+
 
 class AgentMemory:
     """Multi-agent memory client.
@@ -55,6 +235,7 @@ class AgentMemory:
         self._agent_name = agent_name
         self._api_key = api_key
         self._agent: Agent | None = None
+        self._auth_cache_key = _auth_cache_key(self.config.supabase_url, api_key)
 
         # Reuse existing KnowledgeBase for RAG operations
         self._kb = KnowledgeBase(config=self.config)
@@ -65,15 +246,50 @@ class AgentMemory:
             "Authorization": f"Bearer {self.config.supabase_key}",
             "Content-Type": "application/json",
         }
+        self._rest_base = f"{self._base_url}/rest/v1"
+
+        # Pooled keep-alive session: authenticate -> remember -> recall
+        # reuse the same TCP/TLS connections instead of handshaking per call
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=20,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=(429, 502, 503, 504),
+                raise_on_status=False,
+            ),
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._session.headers.update(self._headers)
+
+        self._access_log = _AccessLogger(self._rpc)
+        # Private memories mirrored in-process; built by load_local_index()
+        self._local: LocalIndex | None = None
+
+    def close(self) -> None:
+        """Flush pending access logs and close the HTTP sessions."""
+        self._access_log.close()
+        self._session.close()
+        self._kb.close()
+
+    def __enter__(self) -> "AgentMemory":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
 
     def _rpc(self, fn_name: str, params: dict, timeout: int = 30) -> requests.Response:
         """Call a Supabase RPC function."""
-        return requests.post(
-            f"{self._base_url}/rest/v1/rpc/{fn_name}",
-            headers=self._headers,
-            json=params,
+        resp = self._session.post(
+            f"{self._rest_base}/rpc/{fn_name}",
+            data=dumps(params),
             timeout=timeout,
         )
+        self._check_auth(resp)
+        return resp
 
     def _rest(
         self,
@@ -84,17 +300,27 @@ class AgentMemory:
         prefer: str | None = None,
     ) -> requests.Response:
         """Make a Supabase REST API request."""
-        headers = dict(self._headers)
-        if prefer:
-            headers["Prefer"] = prefer
-        return requests.request(
+        # Merged with the session headers by requests
+        headers = {"Prefer": prefer} if prefer else None
+        resp = self._session.request(
             method,
-            f"{self._base_url}/rest/v1/{table}",
+            f"{self._rest_base}/{table}",
             headers=headers,
-            json=data,
+            data=dumps(data) if data is not None else None,
             params=params,
             timeout=30,
         )
+        self._check_auth(resp)
+        return resp
+
+    def _check_auth(self, resp: requests.Response) -> None:
+        """Drop the cached authentication once Supabase rejects a call.
+
+        The next process then runs mb_authenticate_agent again instead of
+        trusting the disk cache until its TTL runs out.
+        """
+        if resp.status_code in (401, 403):
+            _drop_auth_cache_entry(self._auth_cache_key)
 
     # ── Authentication ──────────────────────────────────────────────
 
@@ -112,17 +338,40 @@ class AgentMemory:
         """Shortcut to the authenticated agent's ID."""
         return self.agent.id
 
-    def authenticate(self) -> Agent:
+    def authenticate(self, force_refresh: bool = False) -> Agent:
         """Authenticate this agent using its API key.
 
+        A successful result is cached on disk (hashed key, see
+        AUTH_CACHE_PATH) for config.agent_auth_cache_ttl seconds, so short-lived
+        processes skip the RPC; force_refresh=True always asks Supabase.
+        A revoked key keeps passing from the cache until the entry expires
+        or a later call gets HTTP 401/403 (which drops it).
+
         Returns the Agent on success, raises on failure.
         """
+        ttl = self.config.agent_auth_cache_ttl
+        cache_key = self._auth_cache_key
+        if ttl > 0 and not force_refresh:
+            cached = _load_auth_cache().get(cache_key)
+            try:
+                if cached and time.time() - cached["ts"] < ttl:
+                    self._agent = Agent(
+                        id=UUID(cached["agent_id"]),
+                        name=cached["agent_name"],
+                        agent_type=cached.get("agent_type", "openclaw"),
+                    )
+                    logger.debug("Using cached authentication for agent '%s'", self._agent.name)
+                    return self._agent
+            except (KeyError, TypeError, ValueError):
+                pass  # Malformed entry: authenticate normally and overwrite it
+
         resp = self._rpc("mb_authenticate_agent", {"p_api_key": self._api_key})
         if resp.status_code != 200:
             raise RuntimeError(f"Authentication failed: HTTP {resp.status_code}")
 
-        results = resp.json()
+        results = loads(resp.content)
         if not results:
+            _drop_auth_cache_entry(cache_key)
             raise RuntimeError(
                 f"Authentication failed: invalid API key for agent '{self._agent_name}'"
             )
@@ -134,6 +383,20 @@ class AgentMemory:
             agent_type=row.get("agent_type", "openclaw"),
         )
         logger.info("Authenticated as agent '%s' (%s)", self._agent.name, self._agent.id)
+
+        if ttl > 0:
+            now = time.time()
+            cache = {
+                k: v for k, v in _load_auth_cache().items()
+                if isinstance(v, dict) and now - v.get("ts", 0) < ttl
+            }
+            cache[cache_key] = {
+                "agent_id": str(self._agent.id),
+                "agent_name": self._agent.name,
+                "agent_type": self._agent.agent_type,
+                "ts": now,
+            }
+            _save_auth_cache(cache)
         return self._agent
 
     def register(
@@ -162,7 +425,7 @@ class AgentMemory:
                 f"Registration failed: HTTP {resp.status_code} — {resp.text}"
             )
 
-        agent_id = resp.json()
+        agent_id = loads(resp.content)
         # Strip quotes if returned as JSON string
         if isinstance(agent_id, str):
             agent_id = agent_id.strip('"')
@@ -221,7 +484,7 @@ class AgentMemory:
             "scope": scope.value,
             "content": content,
             "summary": summary,
-            "embedding": embedding,
+            "embedding": _vector_literal(embedding),
             "tags": tags or [],
             "namespace": namespace,
             "importance": importance,
@@ -240,10 +503,10 @@ class AgentMemory:
         if resp.status_code not in (200, 201):
             raise RuntimeError(f"Failed to store memory: HTTP {resp.status_code} — {resp.text}")
 
-        rows = resp.json()
+        rows = loads(resp.content)
         row = rows[0] if isinstance(rows, list) else rows
 
-        return MemoryEntry(
+        entry = MemoryEntry(
             id=UUID(row["id"]),
             agent_id=self.agent_id,
             agent_name=self._agent_name,
@@ -261,6 +524,140 @@ class AgentMemory:
             created_at=row.get("created_at"),
             expires_at=expires_at,
         )
+        if self._local is not None and scope == Scope.PRIVATE:
+            self._local.add(entry)
+        return entry
+
+    def remember_many(self, items: list[dict]) -> list[MemoryEntry]:
+        """Store several memories with one embedding batch and one insert.
+
+        Each item is a dict of remember() keyword arguments plus "content",
+        e.g. {"content": "Users prefer dark mode", "tags": ["ux"]}.
+
+        Returns:
+            The created MemoryEntry objects, in input order.
+        """
+        if not items:
+            return []
+        for item in items:
+            unknown = item.keys() - _REMEMBER_FIELDS
+            if unknown or "content" not in item:
+                raise TypeError(
+                    f"Invalid memory item fields: {sorted(unknown) or 'missing content'}"
+                )
+
+        embeddings = get_embeddings_batch([item["content"] for item in items])
+
+        agent_id = str(self.agent_id)
+        entries = []
+        rows = []
+        for item, embedding in zip(items, embeddings):
+            entry = MemoryEntry(
+                agent_id=self.agent_id,
+                agent_name=self._agent_name,
+                memory_type=item.get("memory_type", MemoryType.SEMANTIC),
+                scope=item.get("scope", Scope.PRIVATE),
+                content=item["content"],
+                summary=item.get("summary"),
+                embedding=embedding,
+                tags=item.get("tags") or [],
+                namespace=item.get("namespace", "default"),
+                importance=item.get("importance", 0.5),
+                metadata=item.get("metadata") or {},
+                source_id=item.get("source_id"),
+                chunk_id=item.get("chunk_id"),
+                expires_at=item.get("expires_at"),
+            )
+            entries.append(entry)
+            # PostgREST bulk inserts need the same keys in every object
+            rows.append({
+                "agent_id": agent_id,
+                "memory_type": entry.memory_type.value,
+                "scope": entry.scope.value,
+                "content": entry.content,
+                "summary": entry.summary,
+                "embedding": _vector_literal(embedding),
+                "tags": entry.tags,
+                "namespace": entry.namespace,
+                "importance": entry.importance,
+                "metadata": entry.metadata,
+                "source_id": entry.source_id,
+                "chunk_id": entry.chunk_id,
+                "expires_at": entry.expires_at.isoformat() if entry.expires_at else None,
+            })
+
+        resp = self._rest(
+            "POST", "mb_memory", data=rows, prefer="return=representation"
+        )
+        if resp.status_code not in (200, 201):
+            raise RuntimeError(f"Failed to store memories: HTTP {resp.status_code} — {resp.text}")
+
+        for entry, row in zip(entries, loads(resp.content)):
+            entry.id = UUID(row["id"])
+            entry.created_at = row.get("created_at")
+            if self._local is not None and entry.scope == Scope.PRIVATE:
+                self._local.add(entry)
+        return entries
+
+    def load_local_index(self, page: int = 500) -> int:
+        """Mirror this agent's private memories for recall(use_local=True).
+
+        Rows are fetched `page` at a time, keyset-paged by id, so the load
+        is complete regardless of the server's max-rows cap (1000 by
+        default on Supabase); keep `page` below that cap.
+
+        The index is kept current by this client's remember/update/forget
+        calls; call again to pick up writes made by other processes.
+        Returns the number of memories indexed.
+        """
+        index = LocalIndex()
+        last_id = None
+        while True:
+            params = {
+                "select": "id,memory_type,content,summary,embedding,tags,"
+                          "namespace,metadata,importance,created_at,expires_at",
+                "agent_id": f"eq.{self.agent_id}",
+                "scope": "eq.private",
+                "embedding": "not.is.null",
+                "order": "id",
+                "limit": str(page),
+            }
+            if last_id is not None:
+                params["id"] = f"gt.{last_id}"
+            resp = self._rest("GET", "mb_memory", params=params)
+            if resp.status_code not in (200, 206):
+                raise RuntimeError(f"Failed to load private memories: HTTP {resp.status_code}")
+
+            rows = loads(resp.content)
+            for r in rows:
+                embedding = r["embedding"]
+                # pgvector columns come back as "[0.1,0.2,...]" strings
+                if isinstance(embedding, str):
+                    embedding = loads(embedding)
+                expires_at = r.get("expires_at")
+                index.add(MemoryEntry(
+                    id=UUID(r["id"]),
+                    agent_id=self.agent_id,
+                    agent_name=self._agent_name,
+                    memory_type=MemoryType(r["memory_type"]),
+                    scope=Scope.PRIVATE,
+                    content=r["content"],
+                    summary=r.get("summary"),
+                    embedding=embedding,
+                    tags=r.get("tags") or [],
+                    namespace=r.get("namespace", "default"),
+                    metadata=r.get("metadata") or {},
+                    importance=r.get("importance", 0.5),
+                    created_at=r.get("created_at"),
+                    expires_at=datetime.fromisoformat(expires_at) if expires_at else None,
+                ))
+
+            if len(rows) < page:
+                break
+            last_id = rows[-1]["id"]
+        self._local = index
+        logger.debug("Indexed %d private memories locally", len(index))
+        return len(index)
 
     def recall(
         self,
@@ -272,19 +669,41 @@ class AgentMemory:
         namespace: str | None = None,
         tags: list[str] | None = None,
         threshold: float = 0.5,
+        use_local: bool = False,
     ) -> list[MemoryEntry]:
         """Search agent memories by semantic similarity.
 
         Returns memories the agent has access to based on scope
         (own private + team + global).
+
+        With use_local=True, private memories are scored in-process
+        (see load_local_index(), called on first use) and only team/global
+        scopes are searched in Supabase; a private-only recall makes no
+        request at all.
         """
         embedding = get_embedding(query)
         if not embedding:
             return []
 
+        local: list[MemoryEntry] = []
+        if use_local:
+            if self._local is None:
+                self.load_local_index()
+            wanted = scopes or list(Scope)
+            if Scope.PRIVATE in wanted:
+                local = self._local.search(
+                    embedding, limit, threshold,
+                    memory_types=memory_types, namespace=namespace, tags=tags,
+                )
+            scopes = [s for s in wanted if s != Scope.PRIVATE]
+            if not scopes:
+                for entry in local:
+                    self._log_access(entry.id)
+                return local
+
         params: dict = {
             "p_agent_id": str(self.agent_id),
-            "p_query_embedding": embedding,
+            "p_query_embedding": _vector_literal(embedding),
             "p_match_count": limit,
             "p_similarity_threshold": threshold,
         }
@@ -300,10 +719,10 @@ class AgentMemory:
         resp = self._rpc("mb_search_memory", params)
         if resp.status_code != 200:
             logger.error("Memory search failed: %s", resp.text)
-            return []
+            return local
 
-        results = resp.json()
-        entries = []
+        results = loads(resp.content)
+        entries = local
         for r in results:
             entry = MemoryEntry(
                 id=UUID(r["id"]),
@@ -322,7 +741,12 @@ class AgentMemory:
             )
             entries.append(entry)
 
-            # Log access asynchronously (append-only, no row locks)
+        if local:
+            entries.sort(key=lambda e: e.similarity or 0.0, reverse=True)
+            del entries[limit:]
+
+        for entry in entries:
+            # Log access in the background (append-only, no row locks)
             self._log_access(entry.id)
 
         return entries
@@ -333,11 +757,14 @@ class AgentMemory:
         *,
         limit: int = 10,
         threshold: float = 0.5,
+        rerank_query: str | None = None,
     ) -> list[SearchResult]:
         """Unified search across agent memories AND RAG knowledge bases.
 
         Returns a mixed list of memory entries and RAG chunks,
-        sorted by similarity.
+        sorted by similarity. With rerank_query, the results are re-embedded
+        (one batch) and reordered by cosine similarity to that text instead;
+        .similarity keeps the score for the original query.
         """
         embedding = get_embedding(query)
         if not embedding:
@@ -347,7 +774,7 @@ class AgentMemory:
             "mb_search_all",
             {
                 "p_agent_id": str(self.agent_id),
-                "p_query_embedding": embedding,
+                "p_query_embedding": _vector_literal(embedding),
                 "p_match_count": limit,
                 "p_similarity_threshold": threshold,
             },
@@ -356,7 +783,7 @@ class AgentMemory:
             logger.error("Unified search failed: %s", resp.text)
             return []
 
-        return [
+        results = [
             SearchResult(
                 result_type=r["result_type"],
                 result_id=r["result_id"],
@@ -365,8 +792,14 @@ class AgentMemory:
                 similarity=r.get("similarity", 0.0),
                 metadata=r.get("metadata", {}),
             )
-            for r in resp.json()
+            for r in loads(resp.content)
         ]
+        if rerank_query and len(results) > 1:
+            rerank_embedding = get_embedding(rerank_query)
+            if rerank_embedding:
+                embeddings = get_embeddings_batch([r.content for r in results])
+                results = [results[i] for i in rerank(rerank_embedding, embeddings)]
+        return results
 
     def forget(self, memory_id: UUID) -> bool:
         """Delete a memory entry (only own memories)."""
@@ -378,7 +811,10 @@ class AgentMemory:
                 "agent_id": f"eq.{self.agent_id}",
             },
         )
-        return resp.status_code in (200, 204)
+        ok = resp.status_code in (200, 204)
+        if ok and self._local is not None:
+            self._local.remove(memory_id)
+        return ok
 
     def update_memory(
         self,
@@ -394,9 +830,11 @@ class AgentMemory:
     ) -> bool:
         """Update fields on an existing memory (only own memories)."""
         data: dict = {"updated_at": "now()"}
+        embedding = None
         if content is not None:
+            embedding = get_embedding(content)
             data["content"] = content
-            data["embedding"] = get_embedding(content)
+            data["embedding"] = _vector_literal(embedding)
         if summary is not None:
             data["summary"] = summary
         if importance is not None:
@@ -419,7 +857,23 @@ class AgentMemory:
                 "agent_id": f"eq.{self.agent_id}",
             },
         )
-        return resp.status_code in (200, 204)
+        ok = resp.status_code in (200, 204)
+        cached = self._local.get(memory_id) if ok and self._local is not None else None
+        if cached is not None:
+            fields = {
+                "content": content, "embedding": embedding, "summary": summary,
+                "importance": importance, "tags": tags, "scope": scope,
+                "metadata": metadata, "expires_at": expires_at,
+            }
+            changes = {k: v for k, v in fields.items() if v is not None}
+            if content is not None and not embedding:
+                # Without the new vector the cached one would be stale
+                self._local.remove(memory_id)
+            elif scope is not None and scope != Scope.PRIVATE:
+                self._local.remove(memory_id)
+            else:
+                self._local.add(replace(cached, **changes))
+        return ok
 
     # ── Convenience methods for memory types ─────────────────────────
 
@@ -497,7 +951,7 @@ class AgentMemory:
             {"p_agent_id": str(self.agent_id)},
         )
         if resp.status_code == 200:
-            result = resp.json()
+            result = loads(resp.content)
             return result if isinstance(result, int) else 0
         return 0
 
@@ -518,7 +972,7 @@ class AgentMemory:
         if resp.status_code not in (200, 201):
             raise RuntimeError(f"Failed to create team: {resp.text}")
 
-        rows = resp.json()
+        rows = loads(resp.content)
         row = rows[0] if isinstance(rows, list) else rows
         team_id = UUID(row["id"])
 
@@ -567,7 +1021,7 @@ class AgentMemory:
             return []
 
         teams = []
-        for row in resp.json():
+        for row in loads(resp.content):
             t = row.get("mb_teams", {})
             if t:
                 teams.append(Team(
@@ -584,7 +1038,7 @@ class AgentMemory:
         """Get memory stats for this agent."""
         resp = self._rpc("mb_agent_stats", {"p_agent_id": str(self.agent_id)})
         if resp.status_code == 200:
-            result = resp.json()
+            result = loads(resp.content)
             if result:
                 return result[0] if isinstance(result, list) else result
         return {}
@@ -592,15 +1046,5 @@ class AgentMemory:
     # ── Internal ─────────────────────────────────────────────────────
 
     def _log_access(self, memory_id: UUID) -> None:
-        """Log a memory access (append-only, no row locks on mb_memory)."""
-        try:
-            self._rpc(
-                "mb_log_access",
-                {
-                    "p_memory_id": str(memory_id),
-                    "p_agent_id": str(self.agent_id),
-                },
-            )
-        except Exception:
-            # Non-critical: access logging should never break recall
-            pass
+        """Queue a memory access log (append-only, no row locks on mb_memory)."""
+        self._access_log.log(memory_id, self.agent_id)
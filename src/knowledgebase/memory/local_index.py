@@ -0,0 +1,145 @@
+"""In-process similarity index over an agent's private memories.
+
+Lets AgentMemory.recall(use_local=True) answer the private part of a
+query without a Supabase round trip. Vectors are unit-normalized and
+int8-quantized once on insert (one byte per dimension plus a scale,
+~4x smaller than float32), so scoring a query is one dot product per memory.
+
+Filtering mirrors mb_search_memory: similarity above the threshold,
+optional memory type / namespace / tag-overlap filters, expired entries
+skipped. rerank() reorders arbitrary candidates against another query.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import operator
+import threading
+from array import array
+from dataclasses import replace
+from datetime import datetime, timezone
+from uuid import UUID
+
+from knowledgebase.memory.models import MemoryEntry, MemoryType
+from knowledgebase.quantize import quantize_int8
+
+
+def _unit(vec) -> array | None:
+    """float32 copy of vec scaled to length 1 (None for a zero vector)."""
+    norm = math.sqrt(sum(map(operator.mul, vec, vec)))
+    if norm == 0:
+        return None
+    return array("f", [x / norm for x in vec])
+
+
+def _expired(entry: MemoryEntry, now: datetime) -> bool:
+    expires_at = entry.expires_at
+    if expires_at is None:
+        return False
+    if expires_at.tzinfo is None:
+        return expires_at <= now.replace(tzinfo=None)
+    return expires_at <= now
+
+
+def rerank(query, embeddings: list, k: int | None = None) -> list[int]:
+    """Indices of embeddings by cosine similarity to query, best first.
+
+    Missing or zero vectors sort last; k limits the result to the top k.
+    """
+    unit = _unit(query)
+    if unit is None:
+        return list(range(len(embeddings)))[:k]
+    scores = []
+    for i, emb in enumerate(embeddings):
+        vec = _unit(emb) if emb is not None else None
+        scores.append((sum(map(operator.mul, unit, vec)) if vec is not None else -2.0, i))
+    # Both are stable, so ties keep their original order
+    by_score = operator.itemgetter(0)
+    if k is not None:
+        best = heapq.nlargest(k, scores, key=by_score)
+    else:
+        best = sorted(scores, key=by_score, reverse=True)
+    return [i for _, i in best]
+
+
+class LocalIndex:
+    """Thread-safe map of memory id -> (entry, int8 codes, scale).
+
+    Stored entries drop their float embedding; only the codes are kept.
+    """
+
+    def __init__(self):
+        self._entries: dict[UUID, tuple[MemoryEntry, array, float]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, entry: MemoryEntry) -> None:
+        """Insert or replace an entry.
+
+        Without an embedding, an already indexed entry keeps its vector and
+        only its fields are replaced; unknown ones are ignored.
+        """
+        if entry.id is None:
+            return
+        if not entry.embedding:
+            with self._lock:
+                existing = self._entries.get(entry.id)
+                if existing is not None:
+                    self._entries[entry.id] = (entry, existing[1], existing[2])
+            return
+        unit = _unit(entry.embedding)
+        if unit is None:
+            return
+        codes, scale = quantize_int8(unit)
+        with self._lock:
+            self._entries[entry.id] = (replace(entry, embedding=None), codes, scale)
+
+    def get(self, memory_id: UUID) -> MemoryEntry | None:
+        item = self._entries.get(memory_id)
+        return item[0] if item else None
+
+    def remove(self, memory_id: UUID) -> None:
+        with self._lock:
+            self._entries.pop(memory_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def search(
+        self,
+        embedding,
+        limit: int = 10,
+        threshold: float = 0.5,
+        memory_types: list[MemoryType] | None = None,
+        namespace: str | None = None,
+        tags: list[str] | None = None,
+    ) -> list[MemoryEntry]:
+        """Most similar entries, best first, with .similarity set."""
+        query = _unit(embedding)
+        if query is None or limit <= 0:
+            return []
+        with self._lock:
+            items = list(self._entries.values())
+
+        now = datetime.now(timezone.utc)
+        wanted_tags = set(tags) if tags else None
+        scored = []
+        for entry, codes, scale in items:
+            if memory_types and entry.memory_type not in memory_types:
+                continue
+            if namespace and entry.namespace != namespace:
+                continue
+            if wanted_tags is not None and wanted_tags.isdisjoint(entry.tags):
+                continue
+            if _expired(entry, now):
+                continue
+            sim = sum(map(operator.mul, query, codes)) * scale
+            if sim > threshold:
+                scored.append((sim, entry))
+
+        best = heapq.nlargest(limit, scored, key=operator.itemgetter(0))
+        return [replace(entry, similarity=sim) for sim, entry in best]
@@ -0,0 +1,26 @@
+"""Vector quantization helpers for OpenClaw Knowledgebase.
+
+Local caches and indexes keep embeddings as int8 codes plus one float
+scale (one byte per dimension instead of a boxed float). Vectors sent to
+Supabase are never quantized.
+
+Usage:
+    from knowledgebase.quantize import quantize_int8
+    codes, scale = quantize_int8(vec)   # vec[i] ~= codes[i] * scale
+"""
+
+from __future__ import annotations
+
+from array import array
+
+
+def quantize_int8(vec) -> tuple[array, float]:
+    """Symmetric int8 quantization: returns (codes, scale), vec ~= codes * scale.
+
+    A zero (or empty) vector gets all-zero codes and a scale of 0.0.
+    """
+    peak = max(map(abs, vec), default=0.0)
+    if peak == 0:
+        return array("b", bytes(len(vec))), 0.0
+    scale = peak / 127
+    return array("b", [round(x / scale) for x in vec]), scale
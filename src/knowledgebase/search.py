@@ -1,6 +1,49 @@
-"""Convenience search functions for OpenClaw Knowledgebase."""
+"""Convenience search functions for OpenClaw Knowledgebase.
+
+search() and search_hybrid() share one pooled KnowledgeBase client per
+process. Code that needs its own session or config should create a
+KnowledgeBase directly.
+"""
+
+import io
 
 from knowledgebase.client import KnowledgeBase, Chunk
+from knowledgebase.config import Config, get_config
+
+# (config it was built from, shared client)
+_shared_kb: tuple[Config, KnowledgeBase] | None = None
+
+
+def _kb() -> KnowledgeBase:
+    """Shared client, reused while the global config object is unchanged.
+    
+    reload_config()/set_config() install a new object, which rebuilds it.
+    """
+    global _shared_kb
+    config = get_config()
+    cached = _shared_kb
+    if cached is not None and cached[0] is config:
+        return cached[1]
+    kb = KnowledgeBase(config=config)
+    _shared_kb = (config, kb)
+    return kb
+
+
+def _to_dicts(chunks: list[Chunk]) -> list[dict]:
+    """Result dicts (one per chunk) for search()/search_hybrid()."""
+    return [
+        {
+            "id": c.id,
+            "source_id": str(c.source_id) if c.source_id else None,
+            "url": c.url,
+            "title": c.title,
+            "content": c.content,
+            "similarity": c.similarity,
+            "chunk_number": c.chunk_number,
+            "source_type": "web",
+        }
+        for c in chunks
+    ]
 
 
 def search(
@@ -24,22 +67,10 @@ def search(
         >>> for r in results:
         ...     print(f"[{r['similarity']:.2f}] {r['title']}")
     """
-    kb = KnowledgeBase()
+    kb = _kb()
     chunks = kb.search_semantic(query, limit=limit, threshold=threshold)
     
-    return [
-        {
-            "id": c.id,
-            "source_id": str(c.source_id) if c.source_id else None,
-            "url": c.url,
-            "title": c.title,
-            "content": c.content,
-            "similarity": c.similarity,
-            "chunk_number": c.chunk_number,
-            "source_type": "web",
-        }
-        for c in chunks
-    ]
+    return _to_dicts(chunks)
 
 
 def search_hybrid(
@@ -58,22 +89,10 @@ def search_hybrid(
     Returns:
         List of dicts with url, title, content, similarity
     """
-    kb = KnowledgeBase()
+    kb = _kb()
     chunks = kb.search_hybrid(query, limit=limit, semantic_weight=semantic_weight)
     
-    return [
-        {
-            "id": c.id,
-            "source_id": str(c.source_id) if c.source_id else None,
-            "url": c.url,
-            "title": c.title,
-            "content": c.content,
-            "similarity": c.similarity,
-            "chunk_number": c.chunk_number,
-            "source_type": "web",
-        }
-        for c in chunks
-    ]
+    return _to_dicts(chunks)
 
 
 def format_results(results: list[dict], max_content: int = 200) -> str:
@@ -81,16 +100,18 @@ def format_results(results: list[dict], max_content: int = 200) -> str:
     if not results:
         return "No results found."
     
-    lines = []
+    buf = io.StringIO()
+    write = buf.write
     for i, r in enumerate(results, 1):
-        sim = r.get("similarity", 0)
+        sim = r.get("similarity") or 0
         title = r.get("title") or r.get("url", "Unknown")
-        content = r.get("content", "")[:max_content]
-        if len(r.get("content", "")) > max_content:
-            content += "..."
+        content = r.get("content") or ""
+        snippet = content[:max_content]
+        if len(content) > max_content:
+            snippet += "..."
         
-        lines.append(f"{i}. [{sim:.2f}] {title}")
-        lines.append(f"   {content}")
-        lines.append("")
+        if i > 1:
+            write("\n")
+        write(f"{i}. [{sim:.2f}] {title}\n   {snippet}\n")
     
-    return "\n".join(lines)
+    return buf.getvalue()
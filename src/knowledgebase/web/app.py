@@ -259,9 +259,12 @@ def create_app() -> FastAPI:
         if "debug" in data:
             os.environ["DEBUG"] = "1" if data["debug"] else "0"
         
-        # Reload config
+        # Reload config (providers are rebuilt from the new config on next use)
         from knowledgebase.config import reload_config
+        from knowledgebase.embeddings import clear_embedding_cache, reset_providers
         reload_config()
+        reset_providers()
+        clear_embedding_cache()
         
         return {"status": "ok", "message": "Settings saved for this session"}
     